@@ -1,17 +1,20 @@
+import asyncio
 from graph.constants import AgentKey
 from llm.prompt import COMPANY_NEWS_PROMPT
 from graph.schema import FundState, AnalystSignal
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from llm.compaction import compact_news, render_records
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
 # thresholds
 thresholds = {
     "news_count": 10,
+    "token_budget": 1500, # prompt tokens of the news payload
 }
 
-def company_news_agent(state: FundState):
+async def company_news_agent(state: FundState):
     """News specialist analyzing company news to provide a signal."""
     agent_name = AgentKey.COMPANY_NEWS
     ticker = state["ticker"]
@@ -25,26 +28,28 @@ def company_news_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Fetching company news")
     
     # Get the company news
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        company_news = router.get_us_stock_news(ticker, trading_date, thresholds["news_count"])
+        company_news = await asyncio.to_thread(router.get_us_stock_news, ticker, trading_date, thresholds["news_count"])
     except Exception as e:
         logger.error(f"Failed to fetch company news for {ticker}: {e}")
         return state
 
     # Analyze news sentiment via LLM
-    news_dict = [m.model_dump_json() for m in company_news]
-    prompt = COMPANY_NEWS_PROMPT.format(news=news_dict)
+    news = compact_news(company_news, thresholds["token_budget"])
+    prompt = COMPANY_NEWS_PROMPT.format(news=render_records(news))
 
     # Get LLM signal
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt,
         llm_config=llm_config,
         pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker
     )
 
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
     
     return {"analyst_signals": [signal]}
@@ -1,13 +1,14 @@
+import asyncio
 from graph.schema import FundState, AnalystSignal
 from graph.constants import AgentKey
 from llm.prompt import FUNDAMENTAL_PROMPT
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
 
-def fundamental_agent(state: FundState):
+async def fundamental_agent(state: FundState):
     """Fundamental analysis specialist focusing on company profitability, growth, cashflow and financial health."""
     agent_name = AgentKey.FUNDAMENTAL
     ticker = state["ticker"]
@@ -20,22 +21,27 @@ def fundamental_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Fetching financial metrics")
 
     # Get the financial metrics
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        fundamentals = router.get_us_stock_fundamentals(ticker=ticker)
+        fundamentals = await asyncio.to_thread(router.get_us_stock_fundamentals, ticker=ticker, trading_date=state["trading_date"])
     except Exception as e:
         logger.error(f"Failed to fetch financial metrics for {ticker}: {e}")
         return state
+    if fundamentals is None:
+        logger.error(f"No financial metrics of {ticker} known on {state['trading_date']}")
+        return state
     
     prompt = FUNDAMENTAL_PROMPT.format(fundamentals=fundamentals.model_dump_json())
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt, 
         llm_config=llm_config, 
-        pydantic_model=AnalystSignal)
+        pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker)
     
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
     
     return {"analyst_signals": [signal]}
 
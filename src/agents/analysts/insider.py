@@ -1,17 +1,20 @@
+import asyncio
 from graph.constants import AgentKey
 from llm.prompt import INSIDER_PROMPT
 from graph.schema import FundState, AnalystSignal
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from llm.compaction import compact_records, fit_token_budget, render_records
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
 # Insider trading thresholds
 thresholds = {
     "num_trades": 10,
+    "token_budget": 1000, # prompt tokens of the trades payload
 }
 
-def insider_agent(state: FundState):
+async def insider_agent(state: FundState):
     """Insider trading specialist analyzing insider activity patterns."""
     agent_name = AgentKey.INSIDER
     llm_config = state["llm_config"]
@@ -25,9 +28,10 @@ def insider_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Fetching insider trades")
     
     # Get the insider trades
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        insider_trades = router.get_us_stock_insider_trades(
+        insider_trades = await asyncio.to_thread(
+            router.get_us_stock_insider_trades,
             ticker=ticker,
             trading_date=trading_date,
             limit=thresholds["num_trades"],
@@ -37,18 +41,21 @@ def insider_agent(state: FundState):
         return state
 
     # Analyze insider trading signal via LLM
-    trades_dict = [m.model_dump_json() for m in insider_trades]
-    prompt = INSIDER_PROMPT.format(num_trades=thresholds["num_trades"],trades=trades_dict)
+    # the ticker is the same for every trade
+    trades = fit_token_budget(compact_records(insider_trades, drop_fields=("ticker",)), thresholds["token_budget"])
+    prompt = INSIDER_PROMPT.format(num_trades=len(trades), trades=render_records(trades))
 
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt,
         llm_config=llm_config,
-        pydantic_model=AnalystSignal
+        pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker
     )
 
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
     
     return {"analyst_signals": [signal]}
 
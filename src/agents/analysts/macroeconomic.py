@@ -1,15 +1,17 @@
+import asyncio
 from graph.schema import FundState, AnalystSignal
 from graph.constants import AgentKey
 from llm.prompt import MACROECONOMIC_PROMPT
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
-def macroeconomic_agent(state: FundState):
+async def macroeconomic_agent(state: FundState):
     """Macroeconomic analysis specialist focusing on economic indicators."""
     agent_name = AgentKey.MACROECONOMIC
     ticker = state["ticker"]
+    trading_date = state["trading_date"]
     llm_config = state["llm_config"]
     portfolio_id = state["portfolio"].id
 
@@ -19,21 +21,23 @@ def macroeconomic_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Fetching macro economic indicators")
 
     # Get the economic indicators
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        economic_indicators = router.get_us_economic_indicators()
+        economic_indicators = await asyncio.to_thread(router.get_us_economic_indicators, trading_date=trading_date)
     except Exception as e:
         logger.error(f"Failed to fetch economic indicators for {ticker}: {e}")
         return state
     
     prompt = MACROECONOMIC_PROMPT.format(economic_indicators=economic_indicators)
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt, 
         llm_config=llm_config, 
-        pydantic_model=AnalystSignal)
+        pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker)
     
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
     
     return {"analyst_signals": [signal]}
\ No newline at end of file
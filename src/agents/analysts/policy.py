@@ -1,17 +1,23 @@
+import asyncio
 from graph.constants import AgentKey
 from llm.prompt import POLICY_PROMPT
 from graph.schema import FundState, AnalystSignal
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from llm.compaction import compact_news, render_records
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
 # thresholds
 thresholds = {
     "news_count": 10,
+    "token_budget": 1000, # prompt tokens of the news payload, per topic
 }
 
-def policy_agent(state: FundState):
+# market news topics, fiscal first then monetary
+POLICY_TOPICS = ["economy_fiscal", "economy_monetary"]
+
+async def policy_agent(state: FundState):
     """policy specialist analyzing market news to provide a signal."""
     agent_name = AgentKey.POLICY
     ticker = state["ticker"]
@@ -25,36 +31,37 @@ def policy_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Fetching policy related news")
     
     # Get the policy news
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        fiscal_policy = router.get_market_news(
-            topic="economy_fiscal", 
-            trading_date=trading_date, 
-            news_count=thresholds["news_count"]
-            )
-        monetary_policy = router.get_market_news(
-            topic="economy_monetary", 
-                trading_date=trading_date, 
+        # both topics are fetched concurrently
+        fiscal_policy, monetary_policy = await asyncio.gather(*[
+            asyncio.to_thread(
+                router.get_market_news,
+                topic=topic,
+                trading_date=trading_date,
                 news_count=thresholds["news_count"]
-            )
+            ) for topic in POLICY_TOPICS
+        ])
     except Exception as e:
         logger.error(f"Failed to fetch policy news for {ticker}: {e}")
         return state
 
     # Analyze news sentiment via LLM
-    fiscal_policy_dict = [m.model_dump_json() for m in fiscal_policy]
-    monetary_policy_dict = [m.model_dump_json() for m in monetary_policy]
-    prompt = POLICY_PROMPT.format(fiscal_policy=fiscal_policy_dict, monetary_policy=monetary_policy_dict)
+    fiscal_news = compact_news(fiscal_policy, thresholds["token_budget"])
+    monetary_news = compact_news(monetary_policy, thresholds["token_budget"])
+    prompt = POLICY_PROMPT.format(fiscal_policy=render_records(fiscal_news), monetary_policy=render_records(monetary_news))
 
     # Get LLM signal
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt,
         llm_config=llm_config,
         pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker
     )
 
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
     
     return {"analyst_signals": [signal]}
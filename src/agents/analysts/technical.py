@@ -1,10 +1,11 @@
+import asyncio
 import math
 import pandas as pd
 from graph.schema import FundState, AnalystSignal
 from graph.constants import Signal, AgentKey
 from llm.prompt import TECHNICAL_PROMPT
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.inference import agent_acall
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
@@ -43,7 +44,7 @@ thresholds = {
 }
 
 
-def technical_agent(state: FundState):
+async def technical_agent(state: FundState):
     """Technical analysis specialist that excels at short to medium-term price movement predictions."""
     agent_name = AgentKey.TECHNICAL
     ticker = state["ticker"]
@@ -57,9 +58,9 @@ def technical_agent(state: FundState):
     logger.log_agent_status(agent_name, ticker, "Analyzing price data")
 
     # Get the price data
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        prices_df = router.get_us_stock_daily_candles_df(ticker=ticker, trading_date=trading_date)
+        prices_df = await asyncio.to_thread(router.get_us_stock_daily_candles_df, ticker=ticker, trading_date=trading_date)
     except Exception as e:
         logger.error(f"Failed to fetch price data for {ticker}: {e}")
         return state
@@ -81,15 +82,17 @@ def technical_agent(state: FundState):
     )
 
     # Get LLM signal
-    signal = agent_call(
+    signal = await agent_acall(
         prompt=prompt,
         llm_config=llm_config,
-        pydantic_model=AnalystSignal
+        pydantic_model=AnalystSignal,
+        agent_name=agent_name,
+        ticker=ticker
     )
 
     # save signal
     logger.log_signal(agent_name, ticker, signal)
-    db.save_signal(portfolio_id, agent_name, ticker, prompt, signal)
+    await asyncio.to_thread(db.save_signal, portfolio_id, agent_name, ticker, prompt, signal)
 
     return {"analyst_signals": [signal]}
 
@@ -37,8 +37,16 @@ def planner_agent(ticker: str, llm_config: Dict[str, Any], workflow_analysts: Li
     result = agent_call(
         prompt=prompt,
         llm_config=llm_config,
-        pydantic_model=PlannerOutput
+        pydantic_model=PlannerOutput,
+        agent_name=AgentKey.PLANNER,
+        ticker=ticker
     )
 
     logger.info(f"Planner agent selected {result.analysts} | Justification: {result.justification}")
-    return result.analysts
\ No newline at end of file
+
+    # keep only the analysts offered, falling back to all of them
+    analysts = [a for a in result.analysts if a in workflow_analysts]
+    if not analysts:
+        logger.warning(f"Planner selected no valid analyst for {ticker}, using all of {workflow_analysts}")
+        return list(workflow_analysts)
+    return analysts
\ No newline at end of file
@@ -1,8 +1,9 @@
+import asyncio
 from graph.constants import AgentKey, Action
-from llm.prompt import PORTFOLIO_PROMPT, RISK_CONTROL_PROMPT
-from graph.schema import Decision, FundState, PositionRisk
-from llm.inference import agent_call
-from apis.router import Router, APISource
+from llm.prompt import PORTFOLIO_PROMPT, RISK_CONTROL_PROMPT, RISK_DECISION_PROMPT
+from graph.schema import Decision, FundState, PositionRisk, RiskDecision
+from llm.inference import agent_acall
+from apis.router import Router
 from util.db_helper import get_db
 from util.logger import logger
 
@@ -11,7 +12,7 @@ thresholds = {
     "decision_memory_limit": 5
 }
 
-def portfolio_agent(state: FundState):
+async def portfolio_agent(state: FundState):
     """Makes final trading decisions and generates orders"""
     agent_name = AgentKey.PORTFOLIO
     portfolio = state["portfolio"]
@@ -26,9 +27,9 @@ def portfolio_agent(state: FundState):
     db = get_db()
 
     # Get price data
-    router = Router(APISource.ALPHA_VANTAGE)
+    router = Router(**state["data_config"])
     try:
-        current_price = router.get_us_stock_last_close_price(ticker=ticker, trading_date=trading_date)
+        current_price = await asyncio.to_thread(router.get_us_stock_last_close_price, ticker=ticker, trading_date=trading_date)
     except Exception as e:
         logger.error(f"Failed to fetch price data for {ticker}: {e}")
         raise RuntimeError(f"Failed to make decision")
@@ -40,51 +41,84 @@ def portfolio_agent(state: FundState):
         max_position_ratio = round(2 / num_tickers * 20) / 20
     
 
-    # risk control
-    risk_prompt = RISK_CONTROL_PROMPT.format(
-        ticker_signals=analyst_signals,
-        portfolio=portfolio.model_dump_json(),
-        max_position_ratio=max_position_ratio,
+    # Get decision memory
+    decision_memory = await asyncio.to_thread(db.get_decision_memory, exp_name, ticker, thresholds["decision_memory_limit"])
+
+    if state.get("fused_portfolio"):
+        # risk control and trading decision in one call
+        prompt = RISK_DECISION_PROMPT.format(
+            ticker_signals=analyst_signals,
+            portfolio=portfolio.model_dump_json(),
+            decision_memory=decision_memory,
+            current_price=current_price,
+            current_shares=portfolio.positions[ticker].shares if ticker in portfolio.positions else 0,
+            max_position_ratio=max_position_ratio,
+        )
+
+        logger.log_agent_status(agent_name, ticker, "Risk control and trading decisions")
+        risk_decision = await agent_acall(
+            prompt=prompt,
+            llm_config=llm_config,
+            pydantic_model=RiskDecision,
+            agent_name=agent_name,
+            ticker=ticker
+        )
+
+        position_risk = PositionRisk(
+            optimal_position_ratio=clamp_position_ratio(risk_decision.optimal_position_ratio, max_position_ratio),
+            justification=risk_decision.justification,
+        )
+        logger.log_risk(ticker, position_risk)
+        _, tradable_shares = calculate_ticker_shares(portfolio, current_price, ticker, position_risk.optimal_position_ratio)
+
+        # the model did not see the tradable shares, so the order is bounded here
+        ticker_decision = bound_decision(
+            Decision(action=risk_decision.action, shares=risk_decision.shares, justification=risk_decision.justification),
+            tradable_shares,
+        )
+    else:
+        # risk control
+        risk_prompt = RISK_CONTROL_PROMPT.format(
+            ticker_signals=analyst_signals,
+            portfolio=portfolio.model_dump_json(),
+            max_position_ratio=max_position_ratio,
+
+        )
+
+        position_risk = await agent_acall(
+            prompt=risk_prompt,
+            llm_config=llm_config,
+            pydantic_model=PositionRisk,
+            agent_name=agent_name,
+            ticker=ticker
+        )
+        
+        logger.log_agent_status(agent_name, ticker, "Risk control")
+        logger.log_risk(ticker, position_risk)
 
-    )
+        # verify the position ratio if it is in the range
+        position_risk.optimal_position_ratio = clamp_position_ratio(position_risk.optimal_position_ratio, max_position_ratio)
 
-    position_risk = agent_call(
-        prompt=risk_prompt,
-        llm_config=llm_config,
-        pydantic_model=PositionRisk,
-    )
-    
-    logger.log_agent_status(agent_name, ticker, "Risk control")
-    logger.log_risk(ticker, position_risk)
+        logger.log_agent_status(agent_name, ticker, "Making trading decisions")
 
-    # verify the position ratio if it is in the range
-    if position_risk.optimal_position_ratio > max_position_ratio:
-        # too bullish, set to the max
-        position_risk.optimal_position_ratio = max_position_ratio
-    elif position_risk.optimal_position_ratio < 0:
-        # too bearish, set to 0
-        position_risk.optimal_position_ratio = 0
+        current_shares, tradable_shares = calculate_ticker_shares(portfolio, current_price, ticker, position_risk.optimal_position_ratio)
 
-    logger.log_agent_status(agent_name, ticker, "Making trading decisions")
+        # make trading decision
+        prompt = PORTFOLIO_PROMPT.format(
+            decision_memory=decision_memory,
+            current_price=current_price,
+            current_shares=current_shares,
+            tradable_shares=tradable_shares,
+        )
 
-    # Get decision memory
-    decision_memory = db.get_decision_memory(exp_name, ticker, thresholds["decision_memory_limit"])
-    current_shares, tradable_shares = calculate_ticker_shares(portfolio, current_price, ticker, position_risk.optimal_position_ratio)
-
-    # make trading decision
-    prompt = PORTFOLIO_PROMPT.format(
-        decision_memory=decision_memory,
-        current_price=current_price,
-        current_shares=current_shares,
-        tradable_shares=tradable_shares,
-    )
-
-    # Generate the trading decision
-    ticker_decision = agent_call(
-        prompt=prompt,
-        llm_config=llm_config,
-        pydantic_model=Decision
-    )
+        # Generate the trading decision
+        ticker_decision = await agent_acall(
+            prompt=prompt,
+            llm_config=llm_config,
+            pydantic_model=Decision,
+            agent_name=agent_name,
+            ticker=ticker
+        )
 
     # post-process the decision due to possible reasoning error
     ticker_decision.price = current_price
@@ -93,11 +127,38 @@ def portfolio_agent(state: FundState):
         
     # save decision
     logger.log_decision(ticker, ticker_decision)
-    db.save_decision(portfolio.id, ticker, prompt, ticker_decision, trading_date)
+    await asyncio.to_thread(db.save_decision, portfolio.id, ticker, prompt, ticker_decision, trading_date)
 
     return {"decision": ticker_decision}
 
 
+def clamp_position_ratio(optimal_position_ratio, max_position_ratio):
+    """keep the position ratio in the range [0, max_position_ratio]"""
+    if optimal_position_ratio > max_position_ratio:
+        # too bullish, set to the max
+        return max_position_ratio
+    if optimal_position_ratio < 0:
+        # too bearish, set to 0
+        return 0
+    return optimal_position_ratio
+
+
+def bound_decision(decision, tradable_shares):
+    """bound the shares of a decision by the tradable shares, hold if nothing can be traded"""
+    shares = abs(decision.shares)
+    if decision.action == Action.BUY:
+        shares = min(shares, max(int(tradable_shares), 0))
+    elif decision.action == Action.SELL:
+        shares = min(shares, max(-int(tradable_shares), 0))
+    else:
+        shares = 0
+
+    if shares == 0:
+        decision.action = Action.HOLD
+    decision.shares = shares
+    return decision
+
+
 def calculate_ticker_shares(portfolio, current_price, ticker, optimal_position_ratio):
     """calculate the tradable shares for a given ticker based on portfolio"""
 
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from graph.constants import AgentKey
+from apis.router import AsyncRouter
+from apis.concurrency import gather_limited
+from agents.analysts.company_news import thresholds as company_news_thresholds
+from agents.analysts.insider import thresholds as insider_thresholds
+from agents.analysts.policy import thresholds as policy_thresholds, POLICY_TOPICS
+from util.logger import logger
+
+# Prefetch Thresholds
+thresholds = {
+    "max_concurrency": 16,
+}
+
+async def prefetch_data(analysts_by_ticker: Dict[str, List[str]], trading_date: datetime, data_config: Dict[str, Any]):
+    """
+    Fetch the data of every active analyst and ticker concurrently into the run data context.
+    Agents then read from memory. Failed fetches are logged and left for the agents to retry.
+    """
+    with AsyncRouter(max_concurrency=thresholds["max_concurrency"], **data_config) as router:
+        tasks = {}
+
+        for ticker, analysts in analysts_by_ticker.items():
+            # portfolio manager always needs the last close price
+            tasks[f"{ticker} daily candles"] = router.get_us_stock_daily_candles_df(ticker, trading_date)
+
+            if AgentKey.FUNDAMENTAL in analysts:
+                tasks[f"{ticker} fundamentals"] = router.get_us_stock_fundamentals(ticker, trading_date)
+            if AgentKey.INSIDER in analysts:
+                tasks[f"{ticker} insider trades"] = router.get_us_stock_insider_trades(
+                    ticker, trading_date, insider_thresholds["num_trades"]
+                )
+            if AgentKey.COMPANY_NEWS in analysts:
+                tasks[f"{ticker} company news"] = router.get_us_stock_news(
+                    ticker, trading_date, company_news_thresholds["news_count"]
+                )
+
+        # ticker independent data is fetched once
+        all_analysts = {a for analysts in analysts_by_ticker.values() for a in analysts}
+        if AgentKey.MACROECONOMIC in all_analysts:
+            tasks["economic indicators"] = router.get_us_economic_indicators(trading_date)
+        if AgentKey.POLICY in all_analysts:
+            for topic in POLICY_TOPICS:
+                tasks[f"{topic} news"] = router.get_market_news(topic, trading_date, policy_thresholds["news_count"])
+
+        logger.info(f"Prefetching {len(tasks)} data requests")
+        results = await gather_limited(tasks, thresholds["max_concurrency"])
+        logger.info(f"Prefetched {len(results)}/{len(tasks)} data requests")
@@ -1,3 +1,4 @@
 # import all APIs
 from apis.yfinance import YFinanceAPI
-from apis.alphavantage import AlphaVantageAPI
\ No newline at end of file
+from apis.alphavantage import AlphaVantageAPI
+from apis.local import LocalAPI
\ No newline at end of file
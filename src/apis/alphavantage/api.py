@@ -3,15 +3,52 @@ Alpha Vantage API client implementation.
 Link: https://www.alphavantage.co/documentation/
 Free tier: 25 API requests per day
 Premium tier: 75 API requests per minute
+Set ALPHA_VANTAGE_RATE_LIMIT (e.g. "75/minute") to match your plan.
 """
 
 import os
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
-from apis.common_model import OHLCVCandle, MediaNews
+from concurrent.futures import ThreadPoolExecutor
+from apis.common_model import MediaNews
+from apis.session import get_session
+from apis.ratelimit import TokenBucket, RateLimitError, QuotaExhaustedError
+from apis.resilience import resilient_call, CircuitOpenError
+from apis.cassette import get_cassette
+from apis.insider_store import InsiderTradeStore
+from util.cache import get_cache
+from util.logger import logger
 from .api_model import InsiderTrade, Fundamentals, MacroEconomic
 
+# Cache TTL in seconds per endpoint, set API_CACHE=0 in .env to disable the response cache
+cache_ttl = {
+    "TIME_SERIES_DAILY": 6 * 3600,
+    "INSIDER_TRANSACTIONS": 24 * 3600,
+    "OVERVIEW": 24 * 3600,
+    "NEWS_SENTIMENT": 3600,
+    "NEWS_SENTIMENT_CLOSED": 30 * 24 * 3600, # news window that ended before today never changes
+    "REAL_GDP": 24 * 3600,
+    "CPI": 24 * 3600,
+    "TREASURY_YIELD": 24 * 3600,
+    "FEDERAL_FUNDS_RATE": 24 * 3600,
+    "UNEMPLOYMENT": 24 * 3600,
+    "NONFARM_PAYROLL": 24 * 3600,
+}
+
+# Alpha Vantage daily series fields to OHLCV columns
+CANDLE_COLUMNS = {
+    "1. open": "open",
+    "2. high": "high",
+    "3. low": "low",
+    "4. close": "close",
+    "5. volume": "volume",
+}
+
+# Payload keys Alpha Vantage uses for quota notes and errors, never cached
+QUOTA_KEYS = ("Note", "Information")
+ERROR_KEYS = ("Error Message",)
+
 class AlphaVantageAPI:
     """Alpha Vantage API Wrapper."""
 
@@ -21,72 +58,120 @@ class AlphaVantageAPI:
         self.base_url = f"https://www.alphavantage.co/query?apikey={self.api_key}"
         if self.entitlement:
             self.base_url += f"&entitlement={self.entitlement}"
+        self.cache = get_cache("alpha_vantage") if os.environ.get("API_CACHE", "1") != "0" else None
+
+        self.insider_store = InsiderTradeStore()
+
+        # one quota shared by every thread and process using this key
+        default_rate = "75/minute" if self.entitlement else "25/day"
+        self.rate_limiter = TokenBucket.from_rate(
+            "alpha_vantage",
+            os.environ.get("ALPHA_VANTAGE_RATE_LIMIT", default_rate)
+        )
+
+    def _request(self, params: dict, timeout: float = None) -> dict:
+        """Send a query to Alpha Vantage, recorded into or replayed from the active cassette."""
+        cassette = get_cassette()
+        if cassette:
+            return cassette.fetch("alpha_vantage", params["function"], params, lambda: self._send(params, timeout))
+        return self._send(params, timeout)
 
-    def _get_daily_candles(self, ticker: str, trading_date: datetime) -> list[OHLCVCandle]: 
-        """Get daily candles for a ticker. Filter candles by trading_date."""
-        response = requests.get(
+    def _send(self, params: dict, timeout: float = None) -> dict:
+        """Send a query to Alpha Vantage, serving it from the response cache when possible."""
+        cache_key = None
+        if self.cache:
+            # the api key is not part of the key, the entitlement changes the payload
+            cache_key = self.cache.make_key("alpha_vantage", self.entitlement, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        data = resilient_call(
+            f"alpha_vantage.{params['function']}",
+            lambda request_timeout: self._get(params, request_timeout),
+            timeout
+        )
+
+        if self.cache:
+            self.cache.set(cache_key, data, ttl=self._cache_ttl(params))
+
+        return data
+
+    def _get(self, params: dict, timeout: float) -> dict:
+        """Send one query to Alpha Vantage within the shared quota."""
+        self.rate_limiter.acquire()
+        response = get_session().get(
             url=self.base_url,
-            params={
-                "function": "TIME_SERIES_DAILY", 
-                "symbol": ticker
-            }
+            params=params,
+            timeout=timeout
         )
 
         if response.status_code != 200:
             response.raise_for_status()
-        
-        # parse response into OHLCVCandle objects
-        candle_series = response.json()["Time Series (Daily)"]
-        daily_candles = []
-        
-        for date, data in candle_series.items():
-            candle_date = datetime.strptime(date, "%Y-%m-%d")
-            # Filter by trading_date
-            if candle_date > trading_date:
-                continue
-                
-            candle = OHLCVCandle(
-                date=date,
-                open=float(data["1. open"]),
-                high=float(data["2. high"]),
-                low=float(data["3. low"]),
-                close=float(data["4. close"]),
-                volume=int(data["5. volume"])
-            )
-            daily_candles.append(candle)
-
-        return daily_candles
+
+        data = response.json()
+        for key in QUOTA_KEYS:
+            if key in data:
+                raise self._quota_error(params["function"], data[key])
+        for key in ERROR_KEYS:
+            if key in data:
+                raise ValueError(f"Alpha Vantage {params['function']} error: {data[key]}")
+        return data
+
+    @staticmethod
+    def _quota_error(function: str, note: str) -> Exception:
+        """
+        Error of a quota note. A per minute throttle is retried after a backoff,
+        a daily limit or premium endpoint fails fast since it will not reset for hours.
+        """
+        text = note.lower()
+        if "per minute" in text or "per second" in text:
+            return RateLimitError(f"Alpha Vantage {function} throttled: {note}")
+        return QuotaExhaustedError(f"Alpha Vantage {function} quota exhausted: {note}")
+
+    def _cache_ttl(self, params: dict) -> float:
+        """Get the cache TTL of a query."""
+        function = params["function"]
+        if function == "NEWS_SENTIMENT" and "time_to" in params:
+            time_to = datetime.strptime(params["time_to"], "%Y%m%dT%H%M")
+            if time_to.date() < datetime.now().date():
+                function = "NEWS_SENTIMENT_CLOSED"
+        return cache_ttl.get(function, 3600)
+
+    def get_daily_candles_df(self, ticker: str, trading_date: datetime) -> pd.DataFrame:
+        """Get daily candles as a DataFrame Object with datetime index and numeric columns. Filter candles by trading_date."""
+        data = self._request({
+            "function": "TIME_SERIES_DAILY", 
+            "symbol": ticker
+        })
+
+        return self._parse_candles_df(data["Time Series (Daily)"], trading_date)
+
+    @staticmethod
+    def _parse_candles_df(candle_series: dict, trading_date: datetime) -> pd.DataFrame:
+        """Build the OHLCV frame straight from the JSON time series, without per-row model objects."""
+        columns = list(CANDLE_COLUMNS.values())
+        if not candle_series:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"))
+
+        df = pd.DataFrame(list(candle_series.values()), index=list(candle_series.keys()))
+        df = df.rename(columns=CANDLE_COLUMNS)[columns]
+        df = df.astype({"open": "float64", "high": "float64", "low": "float64", "close": "float64", "volume": "int64"})
+        df.index = pd.to_datetime(df.index, format="%Y-%m-%d")
+        df.index.name = "Date"
+
+        # Sort by date index, then keep candles up to trading_date
+        df.sort_index(inplace=True)
+        return df.loc[:pd.Timestamp(trading_date)]
     
     def get_last_close_price(self, ticker: str, trading_date: datetime) -> float:
         """Get the last close price for a ticker."""
-        daily_candles = self._get_daily_candles(ticker, trading_date)
-        if daily_candles:
-            return daily_candles[0].close
+        df = self.get_daily_candles_df(ticker, trading_date)
+        if not df.empty:
+            return float(df["close"].iloc[-1])
 
         return None
 
-    def get_daily_candles_df(self, ticker: str, trading_date: datetime) -> pd.DataFrame:
-        """Convert daily candles into a DataFrame Object with datetime index and numeric columns."""
-        daily_candles = self._get_daily_candles(ticker, trading_date)
-        
-        # Convert list of OHLCVCandle objects to DataFrame
-        df = pd.DataFrame([candle.model_dump() for candle in daily_candles])
-        
-        # Convert date column to datetime and set as index
-        df["Date"] = pd.to_datetime(df["date"])
-        df.set_index("Date", inplace=True)
-        df.drop("date", axis=1, inplace=True)  # Remove original date column
-        
-        # Convert price and volume columns to numeric
-        numeric_cols = ["open", "high", "low", "close", "volume"]
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-            
-        # Sort by date index
-        df.sort_index(inplace=True)
-        
-        return df
-
 
     def get_insider_trades(self, ticker: str, trading_date: datetime, limit: int=None) -> list[InsiderTrade]:
         """
@@ -101,46 +186,22 @@ class AlphaVantageAPI:
         Returns:
             list[InsiderTrade]: List of insider trades sorted by transaction date
         """
-        response = requests.get(
-            url=self.base_url,
-            params={
-                "function": "INSIDER_TRANSACTIONS", 
-                "symbol": ticker
-            }
-        )
-        
-        if response.status_code != 200:
-            response.raise_for_status()
-
-        trades = response.json()["data"]
-
-        # Filter trades by trading_date if provided
-        if trading_date:
-            filtered_trades = []
-            for trade in trades:
-                transaction_date = datetime.strptime(trade["transaction_date"], "%Y-%m-%d")
-                if transaction_date < trading_date:
-                    filtered_trades.append(trade)
-            trades = filtered_trades
-            
+        fetch_trades = lambda: self._request({
+            "function": "INSIDER_TRANSACTIONS", 
+            "symbol": ticker
+        })["data"]
 
-        trades = trades[:limit]
+        # history is indexed by date once per ticker, each trading date is a binary search
+        trades = self.insider_store.get_trades(ticker, trading_date, limit, fetch_trades)
         
         return [InsiderTrade(**trade) for trade in trades]
 
     def get_fundamentals(self, ticker: str) -> Fundamentals:
         """Get company fundamentals from Alpha Vantage."""
-        response = requests.get(
-            url=self.base_url,
-            params={
-                "function": "OVERVIEW", 
-                "symbol": ticker
-            }
-        )
-        if response.status_code != 200:
-            response.raise_for_status()
-
-        data = response.json()
+        data = self._request({
+            "function": "OVERVIEW", 
+            "symbol": ticker
+        })
         
         # The field names in data match our model's aliases automatically
         try:
@@ -174,16 +235,10 @@ class AlphaVantageAPI:
             time_from = trading_date - timedelta(days=7)
             params["time_from"] = time_from.strftime("%Y%m%dT%H%M")
 
-        response = requests.get(
-            url=self.base_url,
-            params=params
-        )
-        
-        if response.status_code != 200:
-            response.raise_for_status()
+        data = self._request(params)
 
         news_list = []
-        for news in response.json()["feed"]:
+        for news in data["feed"]:
             news_list.append(MediaNews(
                 title=news["title"],
                 publish_time=news["time_published"],
@@ -195,34 +250,28 @@ class AlphaVantageAPI:
 
     def get_economic_indicators(self):
         """
-        Get all economic indicators in one call
+        Get all economic indicators, fetched concurrently
         """
-        indicators = {
-            "real_gdp": self._fetch_indicator("REAL_GDP"),  # default annual
-            "cpi": self._fetch_indicator("CPI"),
-            "treasury_yield": self._fetch_indicator("TREASURY_YIELD"),
-            "federal_funds_rate": self._fetch_indicator("FEDERAL_FUNDS_RATE"),
-            "unemployment": self._fetch_indicator("UNEMPLOYMENT"),
-            "nonfarm_payrolls": self._fetch_indicator("NONFARM_PAYROLL"),
+        functions = {
+            "real_gdp": "REAL_GDP",  # default annual
+            "cpi": "CPI",
+            "treasury_yield": "TREASURY_YIELD",
+            "federal_funds_rate": "FEDERAL_FUNDS_RATE",
+            "unemployment": "UNEMPLOYMENT",
+            "nonfarm_payrolls": "NONFARM_PAYROLL",
         }
-        indicators = {k: v or {} for k, v in indicators.items()}
+        with ThreadPoolExecutor(max_workers=len(functions)) as executor:
+            futures = {k: executor.submit(self._fetch_indicator, f) for k, f in functions.items()}
+            indicators = {k: future.result() or {} for k, future in futures.items()}
         
         return MacroEconomic(**indicators)
 
     def _fetch_indicator(self, function: str) -> dict:
         """Unified indicator fetcher matching pattern"""
         try:
-            response = requests.get(
-                url=self.base_url,
-                params={
-                    "function": function
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = self._request({"function": function}, timeout=10)
             return data.get("data", [{}])[0]  # test，use first data point，better to use 3 data points
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {function}: {str(e)}")
+        except (requests.exceptions.RequestException, RateLimitError, QuotaExhaustedError, CircuitOpenError, ValueError) as e:
+            logger.error(f"Error fetching {function}: {e}")
             return None
 
@@ -0,0 +1,88 @@
+"""
+Record and replay of raw data API responses.
+A cassette is one gzip-compressed JSON file holding every response of a run, keyed by client, endpoint and parameters.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+from util.logger import logger
+
+class CassetteMode:
+    RECORD = "record"
+    REPLAY = "replay"
+
+class CassetteMiss(KeyError):
+    """Raised when a replayed request was never recorded."""
+
+
+class Cassette:
+    """Raw responses of the data API clients for one run."""
+
+    def __init__(self, path: str, mode: CassetteMode):
+        if mode not in (CassetteMode.RECORD, CassetteMode.REPLAY):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._responses: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        if mode == CassetteMode.REPLAY:
+            if not os.path.exists(path):
+                raise ValueError(f"Cassette not found: {path}")
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self._responses = json.load(f)["responses"]
+            logger.info(f"Replaying {len(self._responses)} responses from {path}")
+
+    @staticmethod
+    def make_key(client: str, endpoint: str, params: dict) -> str:
+        """Key of a request, independent of credentials."""
+        raw = json.dumps([client, endpoint, params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def fetch(self, client: str, endpoint: str, params: dict, fetch: Callable[[], Any]) -> Any:
+        """Serve a request from the cassette when replaying, otherwise fetch it and record the raw response."""
+        key = self.make_key(client, endpoint, params)
+        if self.mode == CassetteMode.REPLAY:
+            with self._lock:
+                if key not in self._responses:
+                    raise CassetteMiss(f"{client} {endpoint} {params} not recorded in {self.path}")
+                return self._responses[key]
+
+        response = fetch()
+        with self._lock:
+            self._responses[key] = response
+        return response
+
+    def save(self):
+        """Write the recorded responses to disk."""
+        if self.mode != CassetteMode.RECORD:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                json.dump({"version": 1, "responses": self._responses}, f, separators=(",", ":"))
+            logger.info(f"Recorded {len(self._responses)} responses to {self.path}")
+
+
+# global cassette, set in main.py
+_cassette: Optional[Cassette] = None
+
+def cassette_initialize(path: str, mode: CassetteMode):
+    """Insert a cassette, every data API client records into or replays from it."""
+    global _cassette
+    _cassette = Cassette(path, mode)
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the active cassette, None when not recording or replaying."""
+    return _cassette
+
+def cassette_eject():
+    """Save the active cassette if recording and remove it."""
+    global _cassette
+    if _cassette:
+        _cassette.save()
+    _cassette = None
@@ -0,0 +1,25 @@
+"""Concurrency helpers shared by the async data layer."""
+
+import asyncio
+from typing import Awaitable, Dict
+from util.logger import logger
+
+
+async def gather_limited(tasks: Dict[str, Awaitable], max_concurrency: int) -> Dict[str, object]:
+    """Await the tasks with at most max_concurrency in flight. Failed tasks are logged and left out of the result."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(task):
+        async with semaphore:
+            return await task
+
+    keys = list(tasks.keys())
+    results = await asyncio.gather(*(_run(tasks[k]) for k in keys), return_exceptions=True)
+
+    output = {}
+    for key, result in zip(keys, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to fetch {key}: {result}")
+        else:
+            output[key] = result
+    return output
@@ -0,0 +1,68 @@
+"""Run-scoped and process-wide memo for data fetched by the agents."""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class DataContext:
+    """
+    Thread-safe memo of fetched data.
+    Each key is fetched at most once, concurrent callers of the same key wait for the first fetch.
+    Failed fetches, and values rejected by the keep predicate, are not memoized so the next caller retries.
+    """
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any], keep: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Get the value of key, calling fetch on the first request. With keep, only values it accepts are memoized."""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            value = fetch()
+            if keep is None or keep(value):
+                with self._lock:
+                    self._values[key] = value
+            return value
+
+    def clear(self):
+        """Drop all memoized values."""
+        with self._lock:
+            self._values.clear()
+            self._key_locks.clear()
+
+
+# process context, for data that does not depend on the run, e.g. macro snapshot of a trading date
+_process_context = DataContext()
+
+def get_process_context() -> DataContext:
+    """Get the data context shared by every run in the process."""
+    return _process_context
+
+
+# global run context, owned by AgentWorkflow.run
+_run_context: Optional[DataContext] = None
+
+def start_run_context() -> DataContext:
+    """Open a fresh data context for a workflow run."""
+    global _run_context
+    _run_context = DataContext()
+    return _run_context
+
+def get_run_context() -> Optional[DataContext]:
+    """Get the data context of the current run, None outside a run."""
+    return _run_context
+
+def end_run_context():
+    """Close the data context of the current run."""
+    global _run_context
+    if _run_context:
+        _run_context.clear()
+    _run_context = None
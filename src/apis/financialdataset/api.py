@@ -4,7 +4,9 @@ Link: https://docs.financialdatasets.ai/introduction
 """
 
 import os
-import requests
+from apis.session import get_session
+from apis.cassette import get_cassette
+from apis.resilience import resilient_call
 from .api_model import FinancialMetrics, InsiderTrade
 
 class FinancialDatasetAPI:
@@ -14,18 +16,32 @@ class FinancialDatasetAPI:
         self.api_key = os.environ.get("FINANCIAL_DATASETS_API_KEY")
         self.base_url = "https://api.financialdatasets.ai"
 
+    def _request(self, path: str, params: dict) -> dict:
+        """Send a request, recorded into or replayed from the active cassette."""
+        def send(timeout):
+            response = get_session().get(
+                url=f"{self.base_url}{path}", 
+                headers={"X-API-KEY": self.api_key}, 
+                params=params,
+                timeout=timeout
+                )
+            if response.status_code != 200:
+                response.raise_for_status()
+            return response.json()
+
+        fetch = lambda: resilient_call(f"financialdatasets.{path}", send)
+
+        cassette = get_cassette()
+        if cassette:
+            return cassette.fetch("financialdatasets", path, params, fetch)
+        return fetch()
+
     def get_financial_metrics(self, ticker: str) -> FinancialMetrics:
         """Get a real-time snapshot of key financial metrics and ratios for a ticker."""
-        response = requests.get(
-            url=f"{self.base_url}/financial-metrics/snapshot", 
-            headers={"X-API-KEY": self.api_key}, 
-            params={"ticker": ticker}
-            )
-        if response.status_code != 200:
-            response.raise_for_status()
+        data = self._request("/financial-metrics/snapshot", {"ticker": ticker})
         
         # parse response into FinancialMetric object
-        snapshot = response.json().get("snapshot")
+        snapshot = data.get("snapshot")
         metrics = FinancialMetrics(**snapshot)
         
         return metrics
@@ -43,15 +59,9 @@ class FinancialDatasetAPI:
         Returns:
             list[InsiderTrade]: A list of InsiderTrade objects.
         """
-        response = requests.get(
-            url=f"{self.base_url}/insider-trades", 
-            headers={"X-API-KEY": self.api_key}, 
-            params={"ticker": ticker, "limit": limit}
-            )
-        if response.status_code != 200:
-            response.raise_for_status()
-
-        insider_trades = response.json().get('insider_trades')
+        data = self._request("/insider-trades", {"ticker": ticker, "limit": limit})
+
+        insider_trades = data.get('insider_trades')
         trades = [InsiderTrade(**trade) for trade in insider_trades]
 
         return trades
@@ -0,0 +1,170 @@
+"""
+Fundamentals snapshots keyed by ticker and latest reported quarter, stored in SQLite.
+A ticker is only fetched again when its last fetch is older than the refresh cadence
+or a newer quarter became due for reporting since then.
+A trading date is only served a snapshot that was public by then, never a later one.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import pandas as pd
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+from util.cache import CACHE_DIR
+from util.logger import logger
+from apis.alphavantage.api_model import Fundamentals
+
+# Snapshot settings, override the cadence with FUNDAMENTALS_REFRESH_DAYS in .env
+thresholds = {
+    "refresh_days": int(os.getenv("FUNDAMENTALS_REFRESH_DAYS", "30")),
+    "reporting_lag_days": 45, # days after a quarter end until its numbers are expected
+}
+
+def expected_quarter(as_of: date) -> date:
+    """Latest quarter end whose report should be out by as_of."""
+    reported_by = pd.Timestamp(as_of - timedelta(days=thresholds["reporting_lag_days"]))
+    return pd.offsets.QuarterEnd().rollback(reported_by).date()
+
+
+class FundamentalsStore:
+    """Fundamentals snapshots, one row per ticker and quarter."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(CACHE_DIR, "fundamentals.db")
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = self._get_connection()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot (
+                ticker VARCHAR(10) NOT NULL,
+                latest_quarter VARCHAR(10) NOT NULL,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (ticker, latest_quarter)
+            )
+            ''')
+            # last fetch of each ticker, whatever quarter it returned
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync (
+                ticker VARCHAR(10) PRIMARY KEY,
+                fetched_at REAL NOT NULL
+            )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _get_connection(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _snapshots(self, ticker: str) -> list:
+        """Snapshots of a ticker as (latest_quarter, fetched_at, payload), newest quarter first."""
+        conn = self._get_connection()
+        try:
+            return conn.execute(
+                'SELECT latest_quarter, fetched_at, payload FROM snapshot WHERE ticker = ? ORDER BY latest_quarter DESC',
+                (ticker,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def _last_fetch(self, ticker: str) -> Optional[float]:
+        """Timestamp of the last fetch of a ticker, None if never fetched."""
+        conn = self._get_connection()
+        try:
+            row = conn.execute('SELECT fetched_at FROM sync WHERE ticker = ?', (ticker,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def save(self, ticker: str, fundamentals: Fundamentals, fetched_at: float = None):
+        """
+        Store a snapshot, replacing the payload of the same quarter, and record the fetch.
+        A quarter keeps its first fetch time, the date it is known to have been public by.
+        """
+        fetched_at = fetched_at or time.time()
+        conn = self._get_connection()
+        try:
+            conn.execute(
+                'INSERT INTO snapshot (ticker, latest_quarter, fetched_at, payload) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (ticker, latest_quarter) DO UPDATE SET payload = excluded.payload, '
+                'fetched_at = MIN(fetched_at, excluded.fetched_at)',
+                (ticker, fundamentals.latest_quarter, fetched_at, json.dumps(fundamentals.model_dump(by_alias=True)))
+            )
+            conn.execute('INSERT OR REPLACE INTO sync (ticker, fetched_at) VALUES (?, ?)', (ticker, fetched_at))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _is_stale(self, snapshots: list, last_fetch: Optional[float], as_of: date) -> bool:
+        """Whether the ticker should be fetched again for as_of."""
+        if not snapshots or last_fetch is None:
+            return True
+        if time.time() - last_fetch > thresholds["refresh_days"] * 86400:
+            return True
+        # a fetch only helps if a newer quarter became due after the last one, fiscal quarters
+        # off the calendar would otherwise be refetched on every run until the company reports
+        quarter = expected_quarter(as_of)
+        due_on = quarter + timedelta(days=thresholds["reporting_lag_days"])
+        return snapshots[0][0] < quarter.isoformat() and datetime.fromtimestamp(last_fetch).date() < due_on
+
+    @staticmethod
+    def _serve(snapshots: list, as_of: date) -> Optional[Fundamentals]:
+        """Newest snapshot public by as_of: its quarter was due for reporting, or it was fetched by then."""
+        quarter = expected_quarter(as_of).isoformat()
+        for latest_quarter, fetched_at, payload in snapshots:
+            if latest_quarter <= quarter or datetime.fromtimestamp(fetched_at).date() <= as_of:
+                return Fundamentals(**json.loads(payload))
+        return None
+
+    def get_fundamentals(self, ticker: str, trading_date: Optional[datetime], fetch: Callable[[], Fundamentals]) -> Optional[Fundamentals]:
+        """
+        Get the fundamentals known on trading_date, fetching a new snapshot only when the stored ones are stale.
+        None when every known snapshot is newer than trading_date.
+        """
+        as_of = pd.Timestamp(trading_date).date() if trading_date is not None else datetime.now().date()
+
+        # one fetch per ticker at a time, tickers fetch concurrently
+        with self._locks_lock:
+            lock = self._locks.setdefault(ticker, threading.Lock())
+        with lock:
+            snapshots = self._snapshots(ticker)
+            if self._is_stale(snapshots, self._last_fetch(ticker), as_of):
+                try:
+                    fundamentals = fetch()
+                except Exception as e:
+                    if not snapshots:
+                        raise
+                    logger.warning(f"Fundamentals fetch for {ticker} failed, serving stored snapshot: {e}")
+                    fundamentals = None
+                if fundamentals is not None:
+                    self.save(ticker, fundamentals)
+                    snapshots = self._snapshots(ticker)
+                elif not snapshots:
+                    return None
+
+        fundamentals = self._serve(snapshots, as_of)
+        if fundamentals is None:
+            logger.warning(f"No fundamentals snapshot of {ticker} was public by {as_of}")
+        return fundamentals
+
+
+# global store, created on first use
+_fundamentals_store: Optional[FundamentalsStore] = None
+_fundamentals_store_lock = threading.Lock()
+
+def get_fundamentals_store() -> Optional[FundamentalsStore]:
+    """Get the shared fundamentals store, None when FUNDAMENTALS_STORE=0 disables it."""
+    global _fundamentals_store
+    if os.getenv("FUNDAMENTALS_STORE", "1") == "0":
+        return None
+    with _fundamentals_store_lock:
+        if _fundamentals_store is None:
+            _fundamentals_store = FundamentalsStore()
+        return _fundamentals_store
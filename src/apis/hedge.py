@@ -0,0 +1,104 @@
+"""Hedged requests across data sources with latency-adaptive ordering."""
+
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from util.logger import logger
+
+# Hedge settings
+thresholds = {
+    "ewma_alpha": 0.3, # weight of the newest latency sample
+    "failure_penalty": 10.0, # seconds recorded as latency when a source fails
+    "max_workers": 16,
+}
+
+class SourceStats:
+    """Latency moving average per (source, request), failures count as a slow sample."""
+
+    def __init__(self):
+        self._latency: Dict[Tuple[str, str], float] = {}
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, source: str, request: str, latency: float, ok: bool):
+        """Record one request outcome."""
+        key = (source, request)
+        sample = latency if ok else max(latency, thresholds["failure_penalty"])
+        with self._lock:
+            previous = self._latency.get(key)
+            alpha = thresholds["ewma_alpha"]
+            self._latency[key] = sample if previous is None else alpha * sample + (1 - alpha) * previous
+            counts = self._counts.setdefault(key, {"ok": 0, "failed": 0})
+            counts["ok" if ok else "failed"] += 1
+
+    def order(self, sources: List[str], request: str) -> List[str]:
+        """Order sources fastest first. Unmeasured sources keep their configured order after the measured ones."""
+        with self._lock:
+            return sorted(sources, key=lambda s: self._latency.get((s, request), float("inf")))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Latency and outcome counts per source and request."""
+        with self._lock:
+            return {
+                f"{source}.{request}": {"latency": round(latency, 3), **self._counts[(source, request)]}
+                for (source, request), latency in self._latency.items()
+            }
+
+
+# process-wide stats and workers shared by every Router
+source_stats = SourceStats()
+_executor = ThreadPoolExecutor(max_workers=thresholds["max_workers"], thread_name_prefix="hedge")
+
+
+def hedged_call(request: str, calls: List[Tuple[str, Callable[[], Any]]], hedge_delay: float) -> Any:
+    """
+    Call the fastest known source first. If it has not answered after hedge_delay seconds, or it fails,
+    also call the next one, and so on. The first successful answer wins, slower calls finish in the background.
+    Raises the last error if every source fails.
+    """
+    ordered = source_stats.order([source for source, _ in calls], request)
+    funcs = dict(calls)
+
+    def timed(source: str):
+        start = perf_counter()
+        try:
+            result = funcs[source]()
+        except Exception:
+            source_stats.record(source, request, perf_counter() - start, ok=False)
+            raise
+        source_stats.record(source, request, perf_counter() - start, ok=True)
+        return result
+
+    pending = {}
+    next_idx = 0
+    last_error = None
+
+    def launch():
+        nonlocal next_idx
+        source = ordered[next_idx]
+        next_idx += 1
+        pending[_executor.submit(timed, source)] = source
+
+    launch()
+    while pending:
+        more = next_idx < len(ordered)
+        done, _ = wait(pending, timeout=hedge_delay if more else None, return_when=FIRST_COMPLETED)
+        if not done:
+            logger.debug(f"{request} from {list(pending.values())} slower than {hedge_delay}s, hedging with {ordered[next_idx]}")
+            launch()
+            continue
+
+        for future in done:
+            source = pending.pop(future)
+            try:
+                return future.result()
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{request} from {source} failed: {e}")
+
+        # a failed source is replaced right away
+        if next_idx < len(ordered):
+            launch()
+
+    raise last_error
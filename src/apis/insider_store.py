@@ -0,0 +1,51 @@
+"""Point-in-time store of insider trades, one sorted index per ticker."""
+
+import threading
+import pandas as pd
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+class InsiderTradeIndex:
+    """Insider trades of one ticker sorted by transaction date, queried by binary search."""
+
+    def __init__(self, trades: List[dict], fetched_on: date):
+        # trades arrive latest first, reverse before the stable sort so same-day trades keep their order
+        self.trades = sorted(reversed(trades), key=lambda t: t["transaction_date"])
+        self.dates = [t["transaction_date"] for t in self.trades]
+        self.fetched_on = fetched_on
+
+    def latest_before(self, trading_date: Optional[datetime], limit: Optional[int]) -> List[dict]:
+        """Get the last limit trades strictly before trading_date, latest first."""
+        if trading_date is None:
+            end = len(self.trades)
+        else:
+            # ISO dates compare as strings
+            end = bisect_left(self.dates, pd.Timestamp(trading_date).strftime("%Y-%m-%d"))
+        start = 0 if limit is None else max(0, end - limit)
+        return self.trades[start:end][::-1]
+
+
+class InsiderTradeStore:
+    """
+    Insider trade indexes shared across trading dates.
+    A ticker's history is downloaded once and reused for every trading date up to the download day.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, InsiderTradeIndex] = {}
+        self._lock = threading.Lock()
+
+    def get_trades(self, ticker: str, trading_date: Optional[datetime], limit: Optional[int], fetch_trades: Callable[[], List[dict]]) -> List[dict]:
+        """Get the last limit trades before trading_date, downloading the history only when it does not cover the date."""
+        today = datetime.now().date()
+        as_of = pd.Timestamp(trading_date).date() if trading_date is not None else today
+
+        with self._lock:
+            index = self._indexes.get(ticker)
+        if index is None or as_of > index.fetched_on:
+            index = InsiderTradeIndex(fetch_trades(), fetched_on=today)
+            with self._lock:
+                self._indexes[ticker] = index
+
+        return index.latest_before(trading_date, limit)
@@ -0,0 +1 @@
+from .api import LocalAPI
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Local API client serving fixture files, for offline runs and reproducible benchmarks.
+Fixture layout under the data directory:
+    candles/<TICKER>.csv            date,open,high,low,close,volume
+    news/<TICKER>.json              list of MediaNews
+    market_news/<topic>.json        list of MediaNews
+    insider_trades/<TICKER>.json    list of InsiderTrade, latest first
+    fundamentals/<TICKER>.json      Alpha Vantage OVERVIEW payload
+    economic_indicators.json        MacroEconomic
+"""
+
+import os
+import json
+import pandas as pd
+from datetime import datetime, timedelta
+from apis.common_model import MediaNews
+from apis.alphavantage.api_model import InsiderTrade, Fundamentals, MacroEconomic
+
+# Default fixture directory, override with LOCAL_DATA_DIR in .env or data.local_dir in the config
+LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR") or os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "assets", "local_data"))
+
+class LocalAPI:
+    """Local fixture API Wrapper, returns the same models as AlphaVantageAPI."""
+
+    def __init__(self, data_dir: str = None):
+        self.data_dir = data_dir or LOCAL_DATA_DIR
+        if not os.path.isdir(self.data_dir):
+            raise ValueError(f"Local data directory not found: {self.data_dir}")
+
+    def _load_json(self, *parts: str):
+        """Load a fixture file, None if it does not exist."""
+        path = os.path.join(self.data_dir, *parts)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def get_daily_candles_df(self, ticker: str, trading_date: datetime) -> pd.DataFrame:
+        """Get daily candles as a DataFrame Object with datetime index and numeric columns. Filter candles by trading_date."""
+        path = os.path.join(self.data_dir, "candles", f"{ticker}.csv")
+        df = pd.read_csv(
+            path,
+            index_col="date",
+            parse_dates=["date"],
+            dtype={"open": "float64", "high": "float64", "low": "float64", "close": "float64", "volume": "int64"}
+        )
+        df.index.name = "Date"
+        df.sort_index(inplace=True)
+        return df.loc[:pd.Timestamp(trading_date)]
+
+    def get_last_close_price(self, ticker: str, trading_date: datetime) -> float:
+        """Get the last close price for a ticker."""
+        df = self.get_daily_candles_df(ticker, trading_date)
+        if not df.empty:
+            return float(df["close"].iloc[-1])
+
+        return None
+
+    def get_insider_trades(self, ticker: str, trading_date: datetime, limit: int = None) -> list[InsiderTrade]:
+        """Get insider trades before trading_date, latest first."""
+        trades = self._load_json("insider_trades", f"{ticker}.json") or []
+        if trading_date:
+            as_of = pd.Timestamp(trading_date).strftime("%Y-%m-%d")
+            trades = [t for t in trades if t["transaction_date"] < as_of]
+
+        return [InsiderTrade(**trade) for trade in trades[:limit]]
+
+    def get_fundamentals(self, ticker: str) -> Fundamentals:
+        """Get company fundamentals."""
+        data = self._load_json("fundamentals", f"{ticker}.json")
+        if data is None:
+            raise ValueError(f"No local fundamentals for {ticker}")
+        return Fundamentals(**data)
+
+    def get_news(self, ticker: str = None, topic: str = None, trading_date: datetime = None, limit: int = None) -> list[MediaNews]:
+        """Get company news for a ticker or market news for a topic, from the week up to trading_date, like Alpha Vantage."""
+        if ticker:
+            news = self._load_json("news", f"{ticker}.json") or []
+        else:
+            news = self._load_json("market_news", f"{topic}.json") or []
+
+        news_list = [MediaNews(**n) for n in news]
+        if trading_date:
+            time_to = pd.Timestamp(trading_date)
+            time_from = time_to - timedelta(days=7)
+            news_list = [
+                n for n in news_list
+                if time_from <= pd.to_datetime(n.publish_time, errors="coerce") <= time_to
+            ]
+        return news_list[:limit]
+
+    def get_economic_indicators(self) -> MacroEconomic:
+        """Get all economic indicators."""
+        data = self._load_json("economic_indicators.json")
+        if data is None:
+            raise ValueError("No local economic indicators")
+        return MacroEconomic(**data)
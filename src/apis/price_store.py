@@ -0,0 +1,147 @@
+"""
+Local columnar store of daily candles, one memory-mapped NumPy file per ticker.
+Each sync only appends the trailing bars missing from the file, and records when it ran
+so weekends, holidays and repeated runs up to that time need no fetch.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from util.logger import logger
+
+# Directory holding the price files, override with PRICE_STORE_DIR in .env
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR") or os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "prices"))
+
+# Sync settings
+thresholds = {
+    "resync_hours": 6, # a trading date synced on the same day is fetched again after this, to pick up its close
+}
+
+CANDLE_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "float64"),
+    ("high", "float64"),
+    ("low", "float64"),
+    ("close", "float64"),
+    ("volume", "int64"),
+])
+
+class PriceStore:
+    """Daily candle store with incremental append."""
+
+    def __init__(self, root: str = PRICE_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.npy")
+
+    def _sync_path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.sync")
+
+    def last_sync(self, ticker: str) -> Optional[float]:
+        """Timestamp of the last sync of a ticker, None if never synced."""
+        try:
+            with open(self._sync_path(ticker)) as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _record_sync(self, ticker: str, synced_at: float):
+        path = self._sync_path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(synced_at))
+        os.replace(tmp_path, path)
+
+    def read(self, ticker: str) -> pd.DataFrame:
+        """Read all stored candles of a ticker, sorted by date."""
+        path = self._path(ticker)
+        if os.path.exists(path):
+            records = np.load(path, mmap_mode="r")
+        else:
+            records = np.empty(0, dtype=CANDLE_DTYPE)
+
+        df = pd.DataFrame({name: np.asarray(records[name]) for name in CANDLE_DTYPE.names[1:]})
+        df.index = pd.DatetimeIndex(np.asarray(records["date"]), name="Date")
+        return df
+
+    def append(self, ticker: str, candles_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge fresh candles into the file of a ticker. Fresh values win on overlapping dates.
+        Fresh candles not overlapping the stored ones would leave a hole, so they replace the stored series instead.
+        """
+        with self._lock:
+            stored_df = self.read(ticker)
+            if not stored_df.empty and not candles_df.empty and candles_df.index[0] > stored_df.index[-1]:
+                logger.warning(
+                    f"Price store for {ticker} has a gap between {stored_df.index[-1].date()} and {candles_df.index[0].date()}, "
+                    "replacing the stored series"
+                )
+                stored_df = stored_df.iloc[0:0]
+
+            merged_df = pd.concat([stored_df, candles_df])
+            merged_df = merged_df[~merged_df.index.duplicated(keep="last")].sort_index()
+
+            records = np.empty(len(merged_df), dtype=CANDLE_DTYPE)
+            records["date"] = merged_df.index.values.astype("datetime64[D]")
+            for name in CANDLE_DTYPE.names[1:]:
+                records[name] = merged_df[name].to_numpy()
+
+            # write next to the target and swap, readers never see a partial file
+            path = self._path(ticker)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, records)
+            os.replace(tmp_path, path)
+            self._record_sync(ticker, time.time())
+
+            return merged_df
+
+    def _is_covered(self, ticker: str, stored_df: pd.DataFrame, as_of: pd.Timestamp) -> bool:
+        """Whether the stored candles already hold every bar up to as_of."""
+        if stored_df.empty:
+            return False
+        # the last business day, weekends have no bar
+        if stored_df.index[-1] >= pd.offsets.BDay().rollback(as_of):
+            return True
+        # a sync after as_of saw every bar up to it, holidays included;
+        # a sync on as_of itself only counts for a while since the close may not have been out yet
+        synced_at = self.last_sync(ticker)
+        if synced_at is None:
+            return False
+        synced_on = pd.Timestamp(datetime.fromtimestamp(synced_at)).normalize()
+        return as_of < synced_on or (as_of == synced_on and time.time() - synced_at < thresholds["resync_hours"] * 3600)
+
+    def get_daily_candles_df(self, ticker: str, trading_date: datetime, fetch_latest: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Get daily candles up to trading_date.
+        The network is only hit when the store does not cover trading_date yet, then fetch_latest provides the recent bars to append.
+        """
+        as_of = pd.Timestamp(trading_date).normalize()
+        stored_df = self.read(ticker)
+
+        if not self._is_covered(ticker, stored_df, as_of):
+            logger.debug(f"Price store syncing {ticker} after {stored_df.index[-1].date() if not stored_df.empty else 'empty store'}")
+            stored_df = self.append(ticker, fetch_latest())
+
+        return stored_df.loc[:as_of]
+
+
+_price_store: Optional[PriceStore] = None
+_price_store_lock = threading.Lock()
+
+def get_price_store() -> Optional[PriceStore]:
+    """Get the shared price store, None when PRICE_STORE=0 disables it."""
+    global _price_store
+    if os.getenv("PRICE_STORE", "1") == "0":
+        return None
+    with _price_store_lock:
+        if _price_store is None:
+            _price_store = PriceStore()
+        return _price_store
@@ -0,0 +1,104 @@
+"""Token bucket rate limiter shared across threads and processes."""
+
+import os
+import time
+import sqlite3
+from util.cache import CACHE_DIR
+from util.logger import logger
+
+PERIOD_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+class RateLimitError(RuntimeError):
+    """Raised when a request does not fit in the API quota."""
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when the API quota will not reset soon, e.g. a daily limit or a premium only endpoint, so retrying is pointless."""
+
+
+class TokenBucket:
+    """
+    Token bucket persisted in SQLite.
+    Every thread and process using the same name draws from one bucket, the SQLite write lock serializes them.
+    Callers wait for a token up to max_wait seconds, beyond that the quota is treated as exhausted.
+    """
+
+    def __init__(self, name: str, capacity: int, period: float, max_wait: float = 60, path: str = None):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / period # tokens per second
+        self.max_wait = max_wait
+        self.path = path or os.path.join(CACHE_DIR, "ratelimit.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = self._get_connection()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS bucket (
+                name VARCHAR(50) PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            ''')
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_rate(cls, name: str, rate: str, **kwargs) -> "TokenBucket":
+        """Create a bucket from a rate string like '75/minute' or '25/day'."""
+        try:
+            count, period = rate.split("/")
+            return cls(name, capacity=int(count), period=PERIOD_SECONDS[period.strip()], **kwargs)
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit: {rate}. Expected <count>/<second|minute|hour|day>.")
+
+    def _get_connection(self):
+        """Get an autocommit connection so transactions are opened explicitly."""
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _take(self) -> float:
+        """Take a token if available. Returns 0 on success, otherwise the seconds until the next token."""
+        conn = self._get_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated_at FROM bucket WHERE name = ?', (self.name,)).fetchone()
+            if row is None:
+                tokens = float(self.capacity)
+            else:
+                tokens = min(self.capacity, row[0] + (now - row[1]) * self.refill_rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.refill_rate
+
+            conn.execute(
+                'INSERT OR REPLACE INTO bucket (name, tokens, updated_at) VALUES (?, ?, ?)',
+                (self.name, tokens, now)
+            )
+            conn.execute('COMMIT')
+            return wait
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self):
+        """Block until a token is available, raise RateLimitError if that takes longer than max_wait."""
+        deadline = time.time() + self.max_wait
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return
+            if time.time() + wait > deadline:
+                raise RateLimitError(f"{self.name} quota exhausted, next request allowed in {wait:.0f}s")
+            logger.debug(f"{self.name} rate limited, waiting {wait:.2f}s")
+            time.sleep(wait)
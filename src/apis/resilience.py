@@ -0,0 +1,158 @@
+"""
+Resilience for data API requests: per-endpoint timeouts, retries with exponential backoff and jitter,
+and one circuit breaker per endpoint that fails fast while the endpoint is down.
+"""
+
+import random
+import threading
+from time import monotonic, sleep
+from typing import Any, Callable, Dict
+import requests
+from apis.ratelimit import RateLimitError
+from util.logger import logger
+
+# Request timeout in seconds per endpoint, "default" for the others
+timeouts = {
+    "default": 15,
+    "alpha_vantage.TIME_SERIES_DAILY": 20,
+    "alpha_vantage.INSIDER_TRANSACTIONS": 20,
+    "alpha_vantage.NEWS_SENTIMENT": 20,
+    "yfinance.history": 20,
+    "yfinance.search": 10,
+}
+
+# Retry and breaker settings
+thresholds = {
+    "max_retries": 3,
+    "base_delay": 1.0, # seconds before the first retry, doubled each retry
+    "max_delay": 20.0,
+    "deadline": 60.0, # seconds for a request including its retries
+    "failure_threshold": 5, # consecutive failures that open a breaker
+    "reset_timeout": 60.0, # seconds an open breaker fails fast before letting a trial request through
+}
+
+class CircuitOpenError(RuntimeError):
+    """Raised without sending the request while the endpoint breaker is open."""
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive failure breaker of one endpoint."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.counts = {"success": 0, "failure": 0, "rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Let a request through, or raise CircuitOpenError. One trial request probes a half open endpoint."""
+        with self._lock:
+            if self.state == CircuitState.OPEN and monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = CircuitState.HALF_OPEN
+                return
+            if self.state != CircuitState.CLOSED:
+                self.counts["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is {self.state}, failing fast")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CircuitState.CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self.counts["success"] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.counts["failure"] += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    self.counts["opened"] += 1
+                    logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+                self.state = CircuitState.OPEN
+                self.opened_at = monotonic()
+
+    def metrics(self) -> Dict[str, Any]:
+        """State and counters of the breaker."""
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, **self.counts}
+
+
+# process-wide breakers, one per endpoint
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """Get the breaker of an endpoint."""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint, thresholds["failure_threshold"], thresholds["reset_timeout"])
+        return _breakers[endpoint]
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every endpoint breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.metrics() for b in breakers}
+
+def get_timeout(endpoint: str) -> float:
+    """Get the request timeout of an endpoint."""
+    return timeouts.get(endpoint, timeouts["default"])
+
+
+def is_transient(error: Exception) -> bool:
+    """Timeouts, connection errors, throttling and server errors are worth retrying."""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, RateLimitError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Full jitter exponential backoff, or the Retry-After the server asked for."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), thresholds["max_delay"])
+    return random.uniform(0, min(thresholds["max_delay"], thresholds["base_delay"] * 2 ** attempt))
+
+def resilient_call(endpoint: str, send: Callable[[float], Any], timeout: float = None) -> Any:
+    """
+    Send a request with send(timeout) through the endpoint breaker.
+    Transient errors are retried with backoff until max_retries or the deadline, other errors are raised at once.
+    """
+    breaker = get_breaker(endpoint)
+    timeout = timeout or get_timeout(endpoint)
+    deadline = monotonic() + thresholds["deadline"]
+
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = send(timeout)
+        except Exception as e:
+            if not is_transient(e):
+                # the endpoint answered, the request itself is wrong
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = _retry_delay(e, attempt)
+            if attempt >= thresholds["max_retries"] or breaker.state == CircuitState.OPEN or monotonic() + delay > deadline:
+                raise
+            attempt += 1
+            logger.warning(f"{endpoint} failed ({e}), retry {attempt} in {delay:.1f}s")
+            sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -1,51 +1,227 @@
 """Router for APIs"""
 
-from apis import YFinanceAPI, AlphaVantageAPI
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pandas as pd
+from apis import YFinanceAPI, AlphaVantageAPI, LocalAPI
+from apis.context import get_run_context, get_process_context
+from apis.price_store import get_price_store
+from apis.fundamentals_store import get_fundamentals_store
+from apis.cassette import get_cassette
+from apis.hedge import hedged_call
 
 class APISource:
     YFINANCE = "yfinance"
     ALPHA_VANTAGE = "alpha_vantage"
+    LOCAL = "local"
 
 class Router():
-    """Router for APIs"""
+    """
+    Router for APIs.
+    With fallback_sources, requests are hedged: a fallback source is also asked when the fastest known source
+    fails or has not answered after hedge_delay seconds, and the first answer wins.
+    """
+
+    # API clients are shared by every Router in the process
+    _apis = {}
+    _apis_lock = threading.Lock()
     
-    def __init__(self, source: APISource):
+    def __init__(self, source: APISource, local_dir: str = None, fallback_sources: list[APISource] = None, hedge_delay: float = 2.0):
+        self.source = source
+        self.api = self._get_api(source, local_dir)
+        self.fallback_apis = {s: self._get_api(s, local_dir) for s in (fallback_sources or []) if s != source}
+        self.hedge_delay = hedge_delay
+
+    @classmethod
+    def _get_api(cls, source: APISource, local_dir: str = None):
+        """Get the shared API client for a source."""
+        with cls._apis_lock:
+            api_key = (source, local_dir)
+            if api_key not in cls._apis:
+                cls._apis[api_key] = cls._create_api(source, local_dir)
+            return cls._apis[api_key]
+
+    @staticmethod
+    def _create_api(source: APISource, local_dir: str = None):
+        """Create the API client for a source."""
         if source == APISource.YFINANCE:
-            self.api = YFinanceAPI()
+            return YFinanceAPI()
         elif source == APISource.ALPHA_VANTAGE:
-            self.api = AlphaVantageAPI()
+            return AlphaVantageAPI()
+        elif source == APISource.LOCAL:
+            return LocalAPI(local_dir)
         else:
             raise ValueError(f"Invalid API source: {source}")
+
+    def _fetch(self, method: str, call, skip_fallbacks: tuple = ()):
+        """Call an API method on the primary source, hedged with the fallback sources that support it."""
+        candidates = [(self.source, self.api)] + [
+            (s, api) for s, api in self.fallback_apis.items() if hasattr(api, method) and s not in skip_fallbacks
+        ]
+        if len(candidates) == 1:
+            return call(self.api)
+        return hedged_call(method, [(s, lambda api=api: call(api)) for s, api in candidates], self.hedge_delay)
+
+    def _run_memo(self, key, fetch):
+        """Serve a fetch from the data context of the current run, so each request is sent once per run."""
+        run_context = get_run_context()
+        if run_context is None:
+            return fetch()
+        return run_context.get_or_fetch((self.source,) + key, fetch)
+
+    @staticmethod
+    def _get_news(api, trading_date, news_count, ticker=None, topic=None):
+        """Get news from an API, YFinance searches by query."""
+        if isinstance(api, YFinanceAPI):
+            # the search only serves the latest news, keep the ones in the [trading_date - 7d, trading_date] window of the other sources
+            news = api.get_news(query=ticker or topic, news_count=news_count)
+            if trading_date is None:
+                return news
+            time_to = pd.Timestamp(trading_date)
+            time_from = time_to - timedelta(days=7)
+            return [n for n in news if time_from <= pd.to_datetime(n.publish_time, errors="coerce") <= time_to]
+        else:  # AlphaVantageAPI, LocalAPI
+            return api.get_news(ticker=ticker, topic=topic, trading_date=trading_date, limit=news_count)
+
+    @staticmethod
+    def _news_skip_fallbacks(trading_date):
+        """Fallback sources unable to serve the news of trading_date, YFinance only has the latest news."""
+        if trading_date is not None and pd.Timestamp(trading_date).normalize() < pd.Timestamp.now().normalize():
+            return (APISource.YFINANCE,)
+        return ()
     
     def get_us_stock_news(self, ticker, trading_date, news_count):
         """Get news for a ticker"""
-        if isinstance(self.api, AlphaVantageAPI):
-            return self.api.get_news(ticker=ticker, trading_date=trading_date, limit=news_count)
-        else:  # YFinanceAPI
-            return self.api.get_news(query=ticker, news_count=news_count)
+        return self._run_memo(
+            ("news", ticker, trading_date, news_count),
+            lambda: self._fetch(
+                "get_news",
+                lambda api: self._get_news(api, trading_date, news_count, ticker=ticker),
+                self._news_skip_fallbacks(trading_date),
+            )
+        )
     
     def get_market_news(self, topic, trading_date, news_count):
-        """Get market news for a topic."""
-        if isinstance(self.api, AlphaVantageAPI):
-            return self.api.get_news(topic=topic, trading_date=trading_date, limit=news_count)
-        else:  # YFinanceAPI
-            return self.api.get_news(query=topic, news_count=news_count)
+        """Get market news for a topic. The feed does not depend on the ticker, so one fetch per time window serves the whole process."""
+        return get_process_context().get_or_fetch(
+            (self.source, "market_news", topic, trading_date, news_count),
+            lambda: self._fetch(
+                "get_news",
+                lambda api: self._get_news(api, trading_date, news_count, topic=topic),
+                self._news_skip_fallbacks(trading_date),
+            )
+        )
 
     def get_us_stock_insider_trades(self, ticker, trading_date, limit):
-        return self.api.get_insider_trades(ticker, trading_date, limit)
+        """Get insider trades for a ticker"""
+        return self._run_memo(
+            ("insider_trades", ticker, trading_date, limit),
+            lambda: self._fetch("get_insider_trades", lambda api: api.get_insider_trades(ticker, trading_date, limit))
+        )
     
     def get_us_stock_daily_candles_df(self, ticker, trading_date):
-        return self.api.get_daily_candles_df(ticker, trading_date)
+        """Get daily candles for a ticker, fetched once per run and shared by all agents."""
+        df = self._run_memo(
+            ("daily_candles", ticker, trading_date),
+            lambda: self._get_stored_daily_candles_df(ticker, trading_date)
+        )
+        return df.copy()
+    
+    def _get_stored_daily_candles_df(self, ticker, trading_date):
+        """Read daily candles from the local price store, only fetching the bars it is missing."""
+        price_store = get_price_store()
+        # a cassette must see the raw request, so it bypasses the store
+        if price_store is None or self.source != APISource.ALPHA_VANTAGE or get_cassette():
+            return self._fetch("get_daily_candles_df", lambda api: api.get_daily_candles_df(ticker, trading_date))
+        fetch_latest = lambda: self._fetch("get_daily_candles_df", lambda api: api.get_daily_candles_df(ticker, datetime.now()))
+        return price_store.get_daily_candles_df(ticker, trading_date, fetch_latest)
     
     def get_us_stock_last_close_price(self, ticker, trading_date):
         """Get the last close price for a ticker"""
-        return self.api.get_last_close_price(ticker, trading_date)
+        df = self.get_us_stock_daily_candles_df(ticker, trading_date)
+        if df.empty:
+            return None
+        return float(df["close"].iloc[-1])
 
-    def get_us_stock_fundamentals(self, ticker):
-        """Get fundamentals for a ticker"""
-        return self.api.get_fundamentals(ticker)
+    def get_us_stock_fundamentals(self, ticker, trading_date=None):
+        """Get fundamentals for a ticker, from the snapshot of the latest quarter known on trading_date."""
+        return self._run_memo(
+            ("fundamentals", ticker, trading_date),
+            lambda: self._get_stored_fundamentals(ticker, trading_date)
+        )
+
+    def _get_stored_fundamentals(self, ticker, trading_date):
+        """Read fundamentals from the snapshot store, only fetching when a newer quarter may be out."""
+        fundamentals_store = get_fundamentals_store()
+        fetch = lambda: self._fetch("get_fundamentals", lambda api: api.get_fundamentals(ticker))
+        # a cassette must see the raw request, so it bypasses the store
+        if fundamentals_store is None or self.source != APISource.ALPHA_VANTAGE or get_cassette():
+            return fetch()
+        return fundamentals_store.get_fundamentals(ticker, trading_date, fetch)
     
-    def get_us_economic_indicators(self):
-        """Get economic indicators."""
-        return self.api.get_economic_indicators()
+    def get_us_economic_indicators(self, trading_date):
+        """
+        Get economic indicators. They do not depend on the ticker, so one snapshot per trading date serves the whole process.
+        A snapshot missing an indicator is not kept, so the next run fetches it again.
+        """
+        return get_process_context().get_or_fetch(
+            (self.source, "economic_indicators", trading_date),
+            lambda: self._fetch("get_economic_indicators", lambda api: api.get_economic_indicators()),
+            keep=lambda indicators: all(indicators.model_dump().values())
+        )
+
+
+class AsyncRouter():
+    """
+    Async facade of Router. Calls run in worker threads on a shared Router,
+    so they use the same run memo, price store and API clients as the synchronous agents.
+    """
+
+    def __init__(self, source: APISource, max_concurrency: int = 8, **router_kwargs):
+        self.router = Router(source, **router_kwargs)
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the worker threads, without waiting for calls still running."""
+        self.executor.shutdown(wait=False)
+
+    async def _call(self, func, *args):
+        """Run a blocking Router method in the worker threads."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def get_us_stock_news(self, ticker, trading_date, news_count):
+        """Get news for a ticker"""
+        return await self._call(self.router.get_us_stock_news, ticker, trading_date, news_count)
+
+    async def get_market_news(self, topic, trading_date, news_count):
+        """Get market news for a topic."""
+        return await self._call(self.router.get_market_news, topic, trading_date, news_count)
+
+    async def get_us_stock_insider_trades(self, ticker, trading_date, limit):
+        """Get insider trades for a ticker"""
+        return await self._call(self.router.get_us_stock_insider_trades, ticker, trading_date, limit)
+
+    async def get_us_stock_daily_candles_df(self, ticker, trading_date):
+        """Get daily candles for a ticker"""
+        return await self._call(self.router.get_us_stock_daily_candles_df, ticker, trading_date)
+
+    async def get_us_stock_last_close_price(self, ticker, trading_date):
+        """Get the last close price for a ticker"""
+        return await self._call(self.router.get_us_stock_last_close_price, ticker, trading_date)
+
+    async def get_us_stock_fundamentals(self, ticker, trading_date=None):
+        """Get fundamentals for a ticker"""
+        return await self._call(self.router.get_us_stock_fundamentals, ticker, trading_date)
+
+    async def get_us_economic_indicators(self, trading_date):
+        """Get economic indicators."""
+        return await self._call(self.router.get_us_economic_indicators, trading_date)
@@ -0,0 +1,28 @@
+"""Shared HTTP session for the market data clients."""
+
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool settings, override in .env
+pool_config = {
+    "pool_connections": int(os.getenv("HTTP_POOL_CONNECTIONS", 10)), # number of hosts kept alive
+    "pool_maxsize": int(os.getenv("HTTP_POOL_MAXSIZE", 16)), # connections kept alive per host
+    "pool_block": os.getenv("HTTP_POOL_BLOCK", "1") == "1", # wait for a free connection instead of exceeding pool_maxsize
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Get the process-wide session, connections are kept alive and reused across agents and tickers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(**pool_config)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
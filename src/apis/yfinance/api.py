@@ -4,11 +4,17 @@ Link: https://yfinance-python.org/
 """
 
 import yfinance as yf
+import pandas as pd
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from apis.common_model import MediaNews
+from apis.cassette import get_cassette
+from apis.resilience import resilient_call
 
 
+# calendar days of daily candles to fetch, about 100 trading days like Alpha Vantage compact output
+CANDLE_LOOKBACK_DAYS = 150
+
 class YFinanceAPI:
     """YFinance API Wrapper."""
 
@@ -17,10 +23,14 @@ class YFinanceAPI:
     
     def get_news(self, query: str, news_count: int) -> list[MediaNews]:
         """Get news for a ticker. Default news count is 8."""
-        search_result = yf.Search(query=query, news_count=news_count)
+        news = self._fetch_cassette(
+            "search",
+            {"query": query, "news_count": news_count},
+            lambda timeout: yf.Search(query=query, news_count=news_count, timeout=timeout).news
+        )
         
         news_list = []
-        for item in search_result.news:
+        for item in news:
             # process timestamp to human readable format
             publish_time = datetime.fromtimestamp(item["providerPublishTime"]).strftime("%Y-%m-%d %H:%M:%S")
             news_list.append(MediaNews(
@@ -30,3 +40,50 @@ class YFinanceAPI:
             ))
 
         return news_list
+
+    def _fetch_cassette(self, endpoint: str, params: dict, fetch):
+        """Fetch raw data with fetch(timeout), recorded into or replayed from the active cassette."""
+        send = lambda: resilient_call(f"yfinance.{endpoint}", fetch)
+        cassette = get_cassette()
+        if cassette:
+            return cassette.fetch("yfinance", endpoint, params, send)
+        return send()
+
+    def get_daily_candles_df(self, ticker: str, trading_date: datetime) -> pd.DataFrame:
+        """Get daily candles up to trading_date as a DataFrame Object with datetime index and numeric columns."""
+        end = pd.Timestamp(trading_date).normalize() + timedelta(days=1) # end date is exclusive
+        params = {
+            "ticker": ticker,
+            "start": (end - timedelta(days=CANDLE_LOOKBACK_DAYS)).strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+        }
+
+        def fetch(timeout):
+            history = yf.Ticker(ticker).history(start=params["start"], end=params["end"], auto_adjust=False, timeout=timeout)
+            # Yahoo answers a failed or throttled request with an empty frame, it must not win a hedge or be recorded
+            if history.empty:
+                raise ValueError(f"YFinance returned no candles for {ticker} between {params['start']} and {params['end']}")
+            history.index = history.index.strftime("%Y-%m-%d")
+            history = history[["Open", "High", "Low", "Close", "Volume"]].rename(columns=str.lower)
+            return history.to_dict(orient="index")
+
+        candles = self._fetch_cassette("history", params, fetch)
+
+        columns = ["open", "high", "low", "close", "volume"]
+        if not candles:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"))
+
+        df = pd.DataFrame.from_dict(candles, orient="index")[columns]
+        df = df.astype({"open": "float64", "high": "float64", "low": "float64", "close": "float64", "volume": "int64"})
+        df.index = pd.to_datetime(df.index, format="%Y-%m-%d")
+        df.index.name = "Date"
+        df.sort_index(inplace=True)
+        return df
+
+    def get_last_close_price(self, ticker: str, trading_date: datetime) -> float:
+        """Get the last close price for a ticker."""
+        df = self.get_daily_candles_df(ticker, trading_date)
+        if not df.empty:
+            return float(df["close"].iloc[-1])
+
+        return None
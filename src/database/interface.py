@@ -42,6 +42,10 @@ class BaseDB(ABC):
     def save_signal(self, portfolio_id: str, analyst: str, ticker: str, prompt: str, signal: dict) -> str:
         pass
 
+    @abstractmethod
+    def save_llm_usage(self, portfolio_id: str, usages: list) -> bool:
+        pass
+
     @abstractmethod
     def get_recent_portfolio_ids_by_config_id(self, config_id: str, limit: int) -> list:
         pass
@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from graph.schema import Decision, AnalystSignal
+from llm.usage import LLMUsage
 from database.interface import BaseDB
 from database.sqlite_setup import DB_PATH
 from util.logger import logger
@@ -308,6 +309,46 @@ class SQLiteDB(BaseDB):
             if conn:
                 conn.close()
 
+    def save_llm_usage(self, portfolio_id: str, usages: List[LLMUsage]) -> bool:
+        """Save the usage records of the LLM calls of a run."""
+        if not usages:
+            return True
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            updated_at = datetime.now(timezone.utc).isoformat() # UTC time
+            cursor.executemany('''
+                INSERT INTO llm_usage (id, portfolio_id, updated_at, agent, ticker, provider, model, output_schema,
+                                     prompt_tokens, completion_tokens, latency, retries, cost, cached)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                str(uuid.uuid4()),
+                portfolio_id,
+                updated_at,
+                usage.agent,
+                usage.ticker,
+                usage.provider,
+                usage.model,
+                usage.output_schema,
+                usage.prompt_tokens,
+                usage.completion_tokens,
+                round(usage.latency, 3),
+                usage.retries,
+                usage.cost,
+                usage.cached
+            ) for usage in usages])
+
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving llm usage: {e}")
+            return False
+        finally:
+            if conn:
+                conn.close()
+
     def get_recent_portfolio_ids_by_config_id(self, config_id: str, limit: int) -> List[str]:
         """Get recent portfolio ids by config id."""
         conn = None
@@ -73,6 +73,27 @@ def init_database():
     )
     ''')
 
+    # Create llm usage table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS llm_usage (
+        id VARCHAR(36) PRIMARY KEY,
+        portfolio_id VARCHAR(36) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        agent VARCHAR(50) NOT NULL,
+        ticker VARCHAR(10),
+        provider VARCHAR(50) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        output_schema VARCHAR(50) NOT NULL,
+        prompt_tokens INTEGER NOT NULL,
+        completion_tokens INTEGER NOT NULL,
+        latency DECIMAL(10,3) NOT NULL,
+        retries INTEGER NOT NULL,
+        cost DECIMAL(12,6),
+        cached BOOLEAN NOT NULL DEFAULT FALSE,
+        FOREIGN KEY (portfolio_id) REFERENCES portfolio(id)
+    )
+    ''')
+
     # Create indices for better query performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_config_exp_name ON config(exp_name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_portfolio_updated ON portfolio(updated_at)')
@@ -83,6 +104,8 @@ def init_database():
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_signal_portfolio ON signal(portfolio_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_signal_updated ON signal(updated_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_signal_analyst ON signal(analyst)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_portfolio ON llm_usage(portfolio_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_agent ON llm_usage(agent)')
     
     conn.commit()
     conn.close()
@@ -2,6 +2,7 @@ import os
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from graph.schema import Decision, AnalystSignal
+from llm.usage import LLMUsage
 from database.interface import BaseDB
 from supabase import create_client
 from util.logger import logger
@@ -211,6 +212,23 @@ class SupabaseDB(BaseDB):
             logger.error(f"Error saving signal: {e}")
             return None
 
+    def save_llm_usage(self, portfolio_id: str, usages: List[LLMUsage]) -> bool:
+        """Save the usage records of the LLM calls of a run."""
+        if not usages:
+            return True
+        try:
+            data = [{
+                'portfolio_id': portfolio_id,
+                **usage.to_dict(),
+                'latency': round(usage.latency, 3),
+            } for usage in usages]
+
+            self.client.table('llm_usage').insert(data).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving llm usage: {e}")
+            return False
+
     def get_recent_portfolio_ids_by_config_id(self, config_id: str, limit: int) -> List[str]:
         """Get recent portfolio ids by config id."""
         try:
@@ -54,6 +54,24 @@ create table if not exists signal (
     justification text not null
 );
 
+-- LLM usage table
+create table if not exists llm_usage (
+    id uuid primary key default uuid_generate_v4(),
+    portfolio_id uuid references portfolio(id),
+    updated_at timestamp with time zone default now(),
+    agent varchar(50) not null,
+    ticker varchar(10),
+    provider varchar(50) not null,
+    model varchar(50) not null,
+    output_schema varchar(50) not null,
+    prompt_tokens integer not null,
+    completion_tokens integer not null,
+    latency decimal(10,3) not null,
+    retries integer not null,
+    cost decimal(12,6),
+    cached boolean not null default false
+);
+
 -- Create indices
 create index if not exists idx_config_exp_name on config(exp_name);
 create index if not exists idx_portfolio_updated on portfolio(updated_at);
@@ -64,3 +82,5 @@ create index if not exists idx_decision_trading_date on decision(trading_date);
 create index if not exists idx_signal_portfolio on signal(portfolio_id);
 create index if not exists idx_signal_updated on signal(updated_at);
 create index if not exists idx_signal_analyst on signal(analyst);
+create index if not exists idx_llm_usage_portfolio on llm_usage(portfolio_id);
+create index if not exists idx_llm_usage_agent on llm_usage(agent);
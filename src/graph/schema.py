@@ -58,6 +58,25 @@ class PositionRisk(BaseModel):
         default="No assessment provided due to insufficient data"
     )
 
+class RiskDecision(BaseModel):
+    """Risk assessment and decision made by portfolio manager in one call"""
+    optimal_position_ratio: float = Field(
+        description="The optimal ratio of the position value to the total portfolio value",
+        default=0.0
+    )
+    action: Action = Field(
+        description=f"Choose from {Action.BUY}, {Action.SELL}, or {Action.HOLD}",
+        default=Action.HOLD
+    )
+    shares: int = Field(
+        description="Number of shares to buy or sell, set 0 for hold",
+        default=0
+    )
+    justification: str = Field(
+        description="Brief explanation for the position ratio and decision",
+        default="Just hold due to error"
+    )
+
 class Portfolio(BaseModel):
     """Portfolio state when running the workflow."""
     id: str = Field(description="Portfolio id.")
@@ -72,8 +91,10 @@ class FundState(TypedDict):
     trading_date: datetime = Field(description="Trading date.")
     ticker: str = Field(description="Ticker in-the-flow.")
     llm_config: Dict[str, Any] = Field(description="LLM configuration.")
+    data_config: Dict[str, Any] = Field(description="Data source configuration.")
     portfolio: Portfolio = Field(description="Portfolio for the fund.")
     num_tickers: int = Field(description="Number of tickers in the fund.")
+    fused_portfolio: bool = Field(description="Portfolio manager makes one call for risk and decision.")
 
     # updated by workflow
     # ticker -> signal of all analysts
@@ -4,9 +4,15 @@ from graph.schema import FundState, Portfolio, Decision, Action, Position
 from graph.constants import AgentKey
 from agents.registry import AgentRegistry
 from agents.planner import planner_agent
+from apis.context import start_run_context, end_run_context
+from apis.hedge import source_stats
+from apis.resilience import breaker_metrics
+from agents.prefetch import prefetch_data
+from llm.usage import get_usage_tracker
 from util.db_helper import get_db
 from util.logger import logger
 from time import perf_counter
+import asyncio
 
 
 class AgentWorkflow:
@@ -14,6 +20,7 @@ class AgentWorkflow:
 
     def __init__(self, config: Dict[str, Any], config_id: str):
         self.llm_config = config['llm']
+        self.data_config = config['data']
         self.tickers = config['tickers']
         self.exp_name = config['exp_name']
         self.trading_date = config['trading_date']
@@ -33,6 +40,7 @@ class AgentWorkflow:
         
         # Initialize workflow configuration
         self.planner_mode = config.get('planner_mode', False)
+        self.fused_portfolio = config.get('fused_portfolio', False)
         
         # Verify workflow analysts
         if not config.get('workflow_analysts'):
@@ -49,26 +57,33 @@ class AgentWorkflow:
             raise ValueError("No valid analysts remaining after validation")
 
 
-    def build(self) -> StateGraph:
-        """Build the workflow"""
+    def build_analysts(self, analysts: list) -> StateGraph:
+        """Build the analyst stage of a ticker, analysts run in parallel"""
         graph = StateGraph(FundState)
         
-        # create node for portfolio manager
-        portfolio_agent = AgentRegistry.get_agent_func_by_key(AgentKey.PORTFOLIO)
-        graph.add_node(AgentKey.PORTFOLIO, portfolio_agent)
-        
         # create node for each analyst and add edge
-        for analyst in self.current_analysts:
+        for analyst in analysts:
             agent_func = AgentRegistry.get_agent_func_by_key(analyst)
             graph.add_node(analyst, agent_func)
             graph.add_edge(START, analyst)
-            graph.add_edge(analyst, AgentKey.PORTFOLIO)
+            graph.add_edge(analyst, END)
         
-        # Route portfolio manager to end
-        graph.add_edge(AgentKey.PORTFOLIO, END)
         workflow = graph.compile()
 
         return workflow 
+
+    def build_portfolio(self) -> StateGraph:
+        """Build the portfolio manager stage of a ticker"""
+        graph = StateGraph(FundState)
+
+        # create node for portfolio manager
+        portfolio_agent = AgentRegistry.get_agent_func_by_key(AgentKey.PORTFOLIO)
+        graph.add_node(AgentKey.PORTFOLIO, portfolio_agent)
+        graph.add_edge(START, AgentKey.PORTFOLIO)
+        graph.add_edge(AgentKey.PORTFOLIO, END)
+        workflow = graph.compile()
+
+        return workflow
         
 
     def load_analysts(self, ticker: str):
@@ -92,48 +107,105 @@ class AgentWorkflow:
         """Run the workflow."""
         start_time = perf_counter()
 
-        # will be updated by the output of workflow
-        portfolio = self.init_portfolio 
-        for ticker in self.tickers:
-            self.load_analysts(ticker)
-            
-            # init FundState
-            state = FundState(
-                ticker = ticker,
-                exp_name = self.exp_name,
-                trading_date = self.trading_date,
-                llm_config = self.llm_config,
-                portfolio = portfolio,
-                num_tickers = len(self.tickers)
-            )
-
-            # build the workflow
-            workflow = self.build()
-            logger.info(f"{ticker} workflow compiled successfully")
-            try:
-                final_state = workflow.invoke(state)
-            except Exception as e:
-                logger.error(f"Error running deep fund: {e}")
-                raise RuntimeError(f"Failed to generate new portfolio {portfolio.id}")
+        # usage of this run only
+        get_usage_tracker().drain()
 
-            # update portfolio
-            portfolio = self.update_portfolio_ticker(portfolio, ticker, final_state["decision"])
-            logger.log_portfolio(f"{ticker} position update", portfolio)
+        # data fetched in this run is shared across agents, e.g. candles for technical and portfolio manager
+        start_run_context()
+        try:
+            portfolio = self.run_tickers()
+        finally:
+            end_run_context()
 
-            if self.planner_mode:
-                self.current_analysts = None # clean and reset current_analysts
+        stats = source_stats.summary()
+        if stats:
+            logger.info(f"Data source latency: {stats}")
+        breakers = breaker_metrics()
+        if breakers:
+            logger.info(f"Data endpoint breakers: {breakers}")
 
         logger.log_portfolio("Final Portfolio", portfolio)
         logger.info("Updating portfolio to Database")
         portfolio_dict = portfolio.model_dump()
         self.db.update_portfolio(config_id, portfolio_dict, self.trading_date)
 
+        # LLM spend and latency per agent, to tune the expensive stages
+        usages = get_usage_tracker().drain()
+        if usages:
+            logger.info(f"LLM usage breakdown:\n{get_usage_tracker().breakdown(usages)}")
+            self.db.save_llm_usage(portfolio.id, usages)
+
         end_time = perf_counter()
         time_cost = end_time - start_time
 
         return time_cost
 
 
+    def run_tickers(self) -> Portfolio:
+        """Run the workflow ticker by ticker, return the updated portfolio."""
+
+        # select analysts of every ticker first, so their data can be fetched up front
+        analysts_by_ticker = {}
+        for ticker in self.tickers:
+            self.load_analysts(ticker)
+            analysts_by_ticker[ticker] = self.current_analysts
+
+        # prefetch and every agent share one event loop
+        return asyncio.run(self.arun_tickers(analysts_by_ticker))
+
+    async def arun_tickers(self, analysts_by_ticker: Dict[str, list]) -> Portfolio:
+        """Prefetch the data, run the analysts of every ticker, then the portfolio manager ticker by ticker, return the updated portfolio."""
+        data_start_time = perf_counter()
+        await prefetch_data(analysts_by_ticker, self.trading_date, self.data_config)
+        logger.info(f"Data prefetch completed in {perf_counter() - data_start_time:.2f} seconds")
+
+        # analysts do not depend on the positions, so every ticker runs them at once
+        # and their LLM calls of the same output schema are sent as one batch
+        analyst_states = await asyncio.gather(*[
+            self.run_analysts(ticker, analysts_by_ticker[ticker]) for ticker in self.tickers
+        ])
+
+        # will be updated by the output of workflow
+        portfolio = self.init_portfolio 
+        portfolio_workflow = self.build_portfolio()
+        for ticker, analyst_state in zip(self.tickers, analyst_states):
+            state = {**analyst_state, "portfolio": portfolio}
+            try:
+                final_state = await portfolio_workflow.ainvoke(state)
+            except Exception as e:
+                logger.error(f"Error running deep fund: {e}")
+                raise RuntimeError(f"Failed to generate new portfolio {portfolio.id}")
+
+            # update portfolio
+            portfolio = self.update_portfolio_ticker(portfolio, ticker, final_state["decision"])
+            logger.log_portfolio(f"{ticker} position update", portfolio)
+
+        return portfolio
+
+    async def run_analysts(self, ticker: str, analysts: list) -> FundState:
+        """Run the analyst stage of a ticker, return the state holding their signals."""
+        # init FundState
+        state = FundState(
+            ticker = ticker,
+            exp_name = self.exp_name,
+            trading_date = self.trading_date,
+            llm_config = self.llm_config,
+            data_config = self.data_config,
+            portfolio = self.init_portfolio,
+            num_tickers = len(self.tickers),
+            fused_portfolio = self.fused_portfolio
+        )
+
+        # build the workflow
+        workflow = self.build_analysts(analysts)
+        logger.info(f"{ticker} workflow compiled successfully")
+        try:
+            return await workflow.ainvoke(state)
+        except Exception as e:
+            logger.error(f"Error running deep fund: {e}")
+            raise RuntimeError(f"Failed to generate new portfolio {self.init_portfolio.id}")
+
+
     def update_portfolio_ticker(self, portfolio: Portfolio, ticker: str, decision: Decision) -> Portfolio:
         """Update the ticker asset in the portfolio."""
 
@@ -0,0 +1,97 @@
+"""
+Prompt compaction of list payloads like news and insider trades.
+Items are rendered as one compact JSON object per line, without empty fields,
+near-duplicate headlines or overlong text, and trimmed to a token budget.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from util.logger import logger
+
+# Compaction thresholds
+thresholds = {
+    "max_text_chars": 320, # longer text fields, e.g. news summaries, are cut
+    "headline_similarity": 0.9, # word set Jaccard similarity from which headlines are duplicates
+}
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when it is available, else estimate four characters per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"tiktoken unavailable, estimating tokens: {e}")
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+def compact_records(items: Iterable[BaseModel], drop_fields: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """Dump items without empty or dropped fields, cutting long text."""
+    drop = set(drop_fields)
+    records = []
+    for item in items:
+        record = {}
+        for key, value in item.model_dump().items():
+            if key in drop or value is None or value == "" or value == []:
+                continue
+            if isinstance(value, str):
+                value = _truncate(value.strip(), thresholds["max_text_chars"])
+            record[key] = value
+        records.append(record)
+    return records
+
+def _headline_words(title: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", title.lower()))
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two word sets."""
+    return len(a & b) / len(a | b)
+
+def dedupe_headlines(records: List[Dict[str, Any]], key: str = "title") -> List[Dict[str, Any]]:
+    """
+    Drop records repeating the headline of an earlier record, e.g. one wire story run by several publishers,
+    keeping the first. Headlines are compared as word sets, so a single changed word like raises/cuts keeps both.
+    """
+    kept, seen = [], []
+    for record in records:
+        words = _headline_words(record.get(key, ""))
+        if words and any(_similarity(words, w) >= thresholds["headline_similarity"] for w in seen):
+            continue
+        seen.append(words)
+        kept.append(record)
+    return kept
+
+def render_records(records: List[Dict[str, Any]]) -> str:
+    """One compact JSON object per line."""
+    return "\n".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) for r in records)
+
+def fit_token_budget(records: List[Dict[str, Any]], token_budget: Optional[int]) -> List[Dict[str, Any]]:
+    """Keep the leading records whose rendering fits in token_budget, at least one."""
+    if token_budget is None:
+        return records
+    kept, used = [], 0
+    for record in records:
+        tokens = count_tokens(render_records([record])) + 1 # newline
+        if kept and used + tokens > token_budget:
+            break
+        kept.append(record)
+        used += tokens
+    if len(kept) < len(records):
+        logger.debug(f"Token budget {token_budget} keeps {len(kept)}/{len(records)} items")
+    return kept
+
+def compact_news(news: Iterable[BaseModel], token_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Compact news items, latest first as served, without near-duplicate headlines."""
+    return fit_token_budget(dedupe_headlines(compact_records(news, drop_fields=("link",))), token_budget)
@@ -0,0 +1,103 @@
+"""
+Offline stand-in chat model for load and regression runs.
+Answers every structured output call with schema-valid tool call arguments derived
+from a hash of the prompt, so the same prompt always gets the same output.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+class RateLimitError(RuntimeError):
+    """Injected failure, classified as transient like a provider throttle."""
+    status_code = 429
+
+
+def _fake_value(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random, name: str) -> Any:
+    """Random value valid for a JSON schema property."""
+    if "$ref" in schema:
+        schema = defs[schema["$ref"].split("/")[-1]]
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    for key in ("anyOf", "allOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return _fake_value(options[0], defs, rng, name)
+
+    kind = schema.get("type", "string")
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 1.0)), 2)
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 10))
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "array":
+        return [_fake_value(schema.get("items", {}), defs, rng, name) for _ in range(rng.randint(1, 3))]
+    if kind == "object":
+        return _fake_object(schema, defs, rng)
+    return f"fake {name} {rng.getrandbits(32):08x}"
+
+def _fake_object(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    return {name: _fake_value(prop, defs, rng, name) for name, prop in schema.get("properties", {}).items()}
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering tool calls without a network, with optional latency and failures."""
+    model: str = "fake"
+    temperature: Optional[float] = None
+    latency: float = 0.0 # seconds per call
+    failure_rate: float = 0.0 # share of calls raising RateLimitError
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]) -> ChatResult:
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RateLimitError("Fake model injected failure")
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        seed = int.from_bytes(hashlib.sha256(prompt.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+
+        tool_calls = []
+        if tools:
+            function = tools[0]["function"]
+            parameters = function.get("parameters", {})
+            args = _fake_object(parameters, parameters.get("$defs", {}), rng)
+            tool_calls.append({"name": function["name"], "args": args, "id": f"call_{seed:016x}", "type": "tool_call"})
+            content = ""
+        else:
+            content = f"fake response {seed:016x}"
+
+        input_tokens = len(prompt) // 4 + 1
+        output_tokens = len(json.dumps([c["args"] for c in tool_calls]) + content) // 4 + 1
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
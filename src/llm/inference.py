@@ -1,8 +1,20 @@
 import os
-from typing import Dict, Any
+import time
+import asyncio
+import contextvars
+import threading
+import weakref
+import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, List, Optional, Set, Tuple, Type
 from dataclasses import dataclass
 from pydantic import BaseModel
+from langchain_core.runnables import RunnableLambda
 from llm.provider import Provider
+from llm.prompt import REPAIR_PROMPT
+from llm.retry import RetryPolicy
+from llm.usage import LLMUsage, get_usage_tracker
+from util.cache import get_cache
 from util.logger import logger
 
 @dataclass
@@ -11,11 +23,55 @@ class LLMConfig:
     provider: str
     model: str
     temperature: float = 0.5
-    max_retries: int = 3
+    max_retries: int = 3 # attempts per call, including the first one
+    retry_base_delay: float = 1.0 # seconds, doubled each retry with full jitter
+    retry_max_delay: float = 30.0
+    retry_deadline: float = 180.0 # seconds for a call including its retries
+    cache: bool = False # reuse validated outputs of identical prompts across runs
+    cache_ttl: Optional[float] = None # seconds, None keeps entries until evicted
+    cache_max_entries: int = 20000
+    max_concurrency: Optional[int] = None # in-flight async requests, defaults to the provider limit
+    batch_window: float = 0.05 # seconds agent_acall waits for same-schema prompts to send as one batch, 0 disables
+    max_batch_size: int = 32
+    input_price: Optional[float] = None # USD per million prompt tokens, defaults to llm/usage.py MODEL_PRICES
+    output_price: Optional[float] = None # USD per million completion tokens
+    model_kwargs: Optional[Dict[str, Any]] = None # extra client arguments, e.g. latency and failure_rate of the Fake provider
 
 
+# Clients shared by every agent call, keyed by (provider, model, temperature, base_url, model_kwargs)
+_models: Dict[Tuple, Any] = {}
+# Structured output runnables, keyed by client key and output schema
+_structured_models: Dict[Tuple, Any] = {}
+_models_lock = threading.Lock()
+
+def _model_key(config: LLMConfig) -> Tuple:
+    """Registry key of a client."""
+    provider = Provider(config.provider)
+    # serialized since values may be unhashable, e.g. stop sequences or extra headers
+    model_kwargs = json.dumps(config.model_kwargs or {}, sort_keys=True, default=str)
+    return (provider, config.model, config.temperature, provider.config.base_url, model_kwargs)
+
 def get_model(config: LLMConfig):
-    """Get a model instance based on configuration."""
+    """Get the shared model instance for a configuration, created on first use."""
+    key = _model_key(config)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = create_model(config)
+        return _models[key]
+
+def get_structured_model(config: LLMConfig, pydantic_model: Type[BaseModel]):
+    """Get the shared structured output runnable of a model for a schema."""
+    key = (_model_key(config), pydantic_model)
+    with _models_lock:
+        if key in _structured_models:
+            return _structured_models[key]
+    # Explicitly use function_calling method for structured output, the raw message carries the token usage
+    structured = get_model(config).with_structured_output(pydantic_model, method="function_calling", include_raw=True)
+    with _models_lock:
+        return _structured_models.setdefault(key, structured)
+
+def create_model(config: LLMConfig):
+    """Create a model instance based on configuration."""
 
     provider = Provider(config.provider)
     model_config = provider.config
@@ -30,7 +86,8 @@ def get_model(config: LLMConfig):
         "model": config.model,
         **({"api_key": api_key} if model_config.requires_api_key else {}),
         **({"base_url": model_config.base_url} if model_config.base_url else {}),
-        **({"temperature": config.temperature} if config.temperature is not None else {})
+        **({"temperature": config.temperature} if config.temperature is not None else {}),
+        **(config.model_kwargs or {}),
     }
     
     try:
@@ -39,33 +96,347 @@ def get_model(config: LLMConfig):
         logger.error(f"{provider} Chat Error: {e}")
         raise ValueError(f"{provider} Chat Error: {e}")
 
-def agent_call(prompt: str, llm_config: Dict[str, Any], pydantic_model: BaseModel):
+def _response_cache_key(config: LLMConfig, pydantic_model: Type[BaseModel], prompt: str) -> Tuple[Any, str]:
+    """Response cache and the content address of a call."""
+    cache = get_cache("llm", max_entries=config.cache_max_entries)
+    key = cache.make_key(config.provider, config.model, config.temperature, pydantic_model.model_json_schema(), prompt)
+    return cache, key
+
+# Async request slots per provider, one set per event loop since semaphores are bound to their loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Provider, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def _provider_semaphore(config: LLMConfig) -> asyncio.Semaphore:
+    """Get the semaphore bounding in-flight requests to the provider on the running loop."""
+    provider = Provider(config.provider)
+    loop_semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    if provider not in loop_semaphores:
+        loop_semaphores[provider] = asyncio.Semaphore(config.max_concurrency or provider.config.max_concurrency)
+    return loop_semaphores[provider]
+
+def _retry_policy(config: LLMConfig) -> RetryPolicy:
+    """Retry policy of one call."""
+    return RetryPolicy(config.max_retries, config.retry_base_delay, config.retry_max_delay, config.retry_deadline)
+
+# Worker threads of synchronous calls, so a hung request can be abandoned at its deadline
+_call_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="agent_call")
+
+def _invoke_with_deadline(llm, request: str, timeout: float) -> Any:
+    """Invoke a runnable, raising TimeoutError once timeout seconds have passed."""
+    future = _call_executor.submit(contextvars.copy_context().run, llm.invoke, request)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"LLM call exceeded its deadline after {timeout:.1f}s")
+
+def _parse_output(output: Dict[str, Any]) -> BaseModel:
+    """Parsed output of the structured runnable, raising its parsing error."""
+    if output.get("parsing_error") is not None:
+        raise output["parsing_error"]
+    if output.get("parsed") is None:
+        raise ValueError("LLM returned None")
+    return output["parsed"]
+
+def _start_usage(config: LLMConfig, pydantic_model: BaseModel, agent_name: Optional[str], ticker: Optional[str]) -> LLMUsage:
+    """Start the usage record of a call."""
+    return LLMUsage(
+        agent=agent_name or "unknown",
+        ticker=ticker,
+        provider=config.provider,
+        model=config.model,
+        output_schema=pydantic_model.__name__,
+    )
+
+def _record_usage(config: LLMConfig, usage: LLMUsage):
+    """Price and record a finished call."""
+    get_usage_tracker().record(usage.finish(config.input_price, config.output_price))
+
+def _retry_prompt(prompt: str, policy: RetryPolicy, error: Exception) -> str:
+    """Prompt of the next attempt, with the repair instruction once the output failed validation."""
+    return REPAIR_PROMPT.format(prompt=prompt, error=error) if policy.repair else prompt
+
+def agent_call(prompt: str, llm_config: Dict[str, Any], pydantic_model: BaseModel, agent_name: str = None, ticker: str = None):
     """
     Makes an agent call with retry logic and structured output.
+    Transient errors are retried with backoff, an invalid output is re-prompted once, other errors are not retried.
     
     Args:
         prompt: The prompt to send to the LLM
         llm_config: Configuration for the LLM
         output_model: The Pydantic model to use for structured output
+        agent_name: Agent making the call, for usage accounting
+        ticker: Ticker of the call, for usage accounting
     Returns:
         An instance of output_model (with defaults if error occurs)
     """
     llm_cfg = LLMConfig(**llm_config)
-    llm = get_model(llm_cfg)
+    usage = _start_usage(llm_cfg, pydantic_model, agent_name, ticker)
+
+    if llm_cfg.cache:
+        cache, cache_key = _response_cache_key(llm_cfg, pydantic_model, prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            usage.cached = True
+            _record_usage(llm_cfg, usage)
+            return pydantic_model(**cached)
 
-    # Explicitly use function_calling method for structured output
-    llm = llm.with_structured_output(pydantic_model, method="function_calling")
+    llm = get_structured_model(llm_cfg, pydantic_model)
+    policy = _retry_policy(llm_cfg)
+    request = prompt
 
-    for attempt in range(llm_cfg.max_retries):
+    while True:
         try:
-            result = llm.invoke(prompt)
-            if result is None:
-                raise ValueError("LLM returned None")
+            output = _invoke_with_deadline(llm, request, policy.remaining())
+            usage.add_tokens(output)
+            result = _parse_output(output)
+            # only validated outputs are cached, never the default fallback
+            if llm_cfg.cache:
+                cache.set(cache_key, result.model_dump(mode="json"), ttl=llm_cfg.cache_ttl)
+            _record_usage(llm_cfg, usage)
             return result
         except Exception as e:
-            logger.warning(f"Attempt {attempt + 1}/{llm_cfg.max_retries} failed: {e}")
-            if attempt == llm_cfg.max_retries - 1:
-                logger.error(f"All {llm_cfg.max_retries} attempts failed")
+            delay = policy.next_delay(e)
+            logger.warning(f"Attempt {policy.attempt}/{llm_cfg.max_retries} failed: {e}")
+            if delay is None:
+                logger.error(f"Giving up after {policy.attempt} attempts")
+                _record_usage(llm_cfg, usage)
                 return pydantic_model()
-    
-    return pydantic_model() 
\ No newline at end of file
+            usage.retries += 1
+            request = _retry_prompt(prompt, policy, e)
+            time.sleep(delay)
+
+
+async def agent_acall(prompt: str, llm_config: Dict[str, Any], pydantic_model: BaseModel, agent_name: str = None, ticker: str = None):
+    """
+    Async agent_call on ainvoke. Requests to a provider wait for one of its slots,
+    so concurrent agents saturate but never exceed the provider concurrency.
+    With batch_window, prompts of the same model and schema arriving together are sent as one agent_abatch_call.
+    Batches are grouped by LLM config and output schema, not by agent, so every AnalystSignal analyst
+    of every ticker shares a batch.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        llm_config: Configuration for the LLM
+        output_model: The Pydantic model to use for structured output
+        agent_name: Agent making the call, for usage accounting
+        ticker: Ticker of the call, for usage accounting
+    Returns:
+        An instance of output_model (with defaults if error occurs)
+    """
+    llm_cfg = LLMConfig(**llm_config)
+
+    if llm_cfg.batch_window > 0:
+        return await _get_batch_queue(llm_config, pydantic_model).submit(prompt, agent_name, ticker)
+
+    usage = _start_usage(llm_cfg, pydantic_model, agent_name, ticker)
+    if llm_cfg.cache:
+        cache, cache_key = _response_cache_key(llm_cfg, pydantic_model, prompt)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            usage.cached = True
+            _record_usage(llm_cfg, usage)
+            return pydantic_model(**cached)
+
+    llm = get_structured_model(llm_cfg, pydantic_model)
+    semaphore = _provider_semaphore(llm_cfg)
+    policy = _retry_policy(llm_cfg)
+    request = prompt
+
+    while True:
+        try:
+            async with semaphore:
+                output = await asyncio.wait_for(llm.ainvoke(request), timeout=policy.remaining())
+            usage.add_tokens(output)
+            result = _parse_output(output)
+            # only validated outputs are cached, never the default fallback
+            if llm_cfg.cache:
+                await asyncio.to_thread(cache.set, cache_key, result.model_dump(mode="json"), llm_cfg.cache_ttl)
+            _record_usage(llm_cfg, usage)
+            return result
+        except Exception as e:
+            delay = policy.next_delay(e)
+            logger.warning(f"Attempt {policy.attempt}/{llm_cfg.max_retries} failed: {e}")
+            if delay is None:
+                logger.error(f"Giving up after {policy.attempt} attempts")
+                _record_usage(llm_cfg, usage)
+                return pydantic_model()
+            usage.retries += 1
+            request = _retry_prompt(prompt, policy, e)
+            await asyncio.sleep(delay)
+
+
+class _BatchState:
+    """Outputs, pending items and retry policies of one batch call."""
+
+    def __init__(self, llm_cfg: LLMConfig, pydantic_model: BaseModel, prompts: List[str],
+                 agent_names: Optional[List[str]] = None, tickers: Optional[List[str]] = None):
+        self.llm_cfg = llm_cfg
+        self.pydantic_model = pydantic_model
+        self.prompts = prompts
+        self.requests = list(prompts)
+        self.results: List[Any] = [None] * len(prompts)
+        self.policies = [_retry_policy(llm_cfg) for _ in prompts]
+        self.usages = [
+            _start_usage(llm_cfg, pydantic_model, (agent_names or [None] * len(prompts))[i], (tickers or [None] * len(prompts))[i])
+            for i in range(len(prompts))
+        ]
+        self.failed: List[int] = []
+        self.pending: List[int] = []
+        self.fresh: List[int] = []
+
+    def load_cached(self, cached: List[Optional[dict]]):
+        """Fill the cached outputs, the others are pending."""
+        for i, value in enumerate(cached):
+            if value is not None:
+                self.results[i] = self.pydantic_model(**value)
+                self.usages[i].cached = True
+        self.pending = [i for i, r in enumerate(self.results) if r is None]
+        self.fresh = list(self.pending)
+
+    def collect(self, outputs: List[Any]) -> float:
+        """Store a round of outputs, return the seconds to wait before retrying the failed items."""
+        pending, delays = [], []
+        for i, output in zip(self.pending, outputs):
+            if not isinstance(output, Exception):
+                self.usages[i].add_tokens(output)
+                try:
+                    self.results[i] = _parse_output(output)
+                    continue
+                except Exception as e:
+                    output = e
+            delay = self.policies[i].next_delay(output)
+            logger.warning(f"Batch item {i + 1}/{len(self.prompts)} attempt {self.policies[i].attempt} failed: {output}")
+            if delay is None:
+                self.failed.append(i)
+            else:
+                self.requests[i] = _retry_prompt(self.prompts[i], self.policies[i], output)
+                self.usages[i].retries += 1
+                pending.append(i)
+                delays.append(delay)
+        self.pending = pending
+        return max(delays, default=0.0)
+
+    def finish(self) -> List[BaseModel]:
+        """Cache the new outputs, record the usage and fill the failed items with defaults."""
+        if self.failed:
+            logger.error(f"{len(self.failed)}/{len(self.prompts)} batch items failed")
+        for i in self.failed:
+            self.results[i] = self.pydantic_model()
+
+        # only validated outputs are cached, never the default fallback
+        if self.llm_cfg.cache:
+            for i in self.fresh:
+                if i not in self.failed:
+                    cache, cache_key = _response_cache_key(self.llm_cfg, self.pydantic_model, self.prompts[i])
+                    cache.set(cache_key, self.results[i].model_dump(mode="json"), ttl=self.llm_cfg.cache_ttl)
+        for usage in self.usages:
+            _record_usage(self.llm_cfg, usage)
+        return self.results
+
+def _read_cached(llm_cfg: LLMConfig, pydantic_model: BaseModel, prompts: List[str]) -> List[Optional[dict]]:
+    """Cached outputs of prompts, None where missing or when the cache is off."""
+    if not llm_cfg.cache:
+        return [None] * len(prompts)
+    cached = []
+    for prompt in prompts:
+        cache, cache_key = _response_cache_key(llm_cfg, pydantic_model, prompt)
+        cached.append(cache.get(cache_key))
+    return cached
+
+async def agent_abatch_call(prompts: List[str], llm_config: Dict[str, Any], pydantic_model: BaseModel,
+                    agent_names: Optional[List[str]] = None, tickers: Optional[List[str]] = None) -> List[BaseModel]:
+    """
+    Batched agent_acall with the runnable abatch. Failed prompts are retried under the same policy as agent_call,
+    and every item takes a provider slot like agent_acall.
+
+    Args:
+        prompts: The prompts to send to the LLM
+        llm_config: Configuration for the LLM
+        output_model: The Pydantic model to use for structured output
+        agent_names: Agent of each prompt, for usage accounting
+        tickers: Ticker of each prompt, for usage accounting
+    Returns:
+        Instances of output_model in the order of prompts (defaults for prompts that failed)
+    """
+    llm_cfg = LLMConfig(**llm_config)
+    batch = _BatchState(llm_cfg, pydantic_model, prompts, agent_names, tickers)
+    batch.load_cached(await asyncio.to_thread(_read_cached, llm_cfg, pydantic_model, prompts))
+
+    structured = get_structured_model(llm_cfg, pydantic_model)
+    semaphore = _provider_semaphore(llm_cfg)
+
+    # items are indices, so each request is cut off at the deadline of its own policy
+    async def limited_ainvoke(i):
+        async with semaphore:
+            return await asyncio.wait_for(structured.ainvoke(batch.requests[i]), timeout=batch.policies[i].remaining())
+
+    llm = RunnableLambda(lambda i: structured.invoke(batch.requests[i]), afunc=limited_ainvoke)
+
+    while batch.pending:
+        outputs = await llm.abatch(list(batch.pending), return_exceptions=True)
+        delay = batch.collect(outputs)
+        if batch.pending:
+            await asyncio.sleep(delay)
+
+    return await asyncio.to_thread(batch.finish)
+
+class _BatchQueue:
+    """Prompts of one LLM config and output schema waiting to be sent together, whichever agents sent them."""
+
+    def __init__(self, llm_config: Dict[str, Any], pydantic_model: BaseModel):
+        self.llm_config = llm_config
+        self.pydantic_model = pydantic_model
+        llm_cfg = LLMConfig(**llm_config)
+        self.window = llm_cfg.batch_window
+        self.max_size = llm_cfg.max_batch_size
+        self.items: List[Tuple[str, Optional[str], Optional[str], asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # the loop only keeps weak references to tasks, so batches in flight are held here
+        self.tasks: Set[asyncio.Task] = set()
+
+    def submit(self, prompt: str, agent_name: Optional[str] = None, ticker: Optional[str] = None) -> asyncio.Future:
+        """Queue a prompt, the batch is sent when the window closes or it is full."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.items.append((prompt, agent_name, ticker, future))
+        if len(self.items) >= self.max_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        """Send the queued prompts."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        items, self.items = self.items, []
+        if items:
+            task = asyncio.ensure_future(self._send(items))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, items: List[Tuple[str, Optional[str], Optional[str], asyncio.Future]]):
+        prompts, agent_names, tickers, futures = (list(column) for column in zip(*items))
+        if len(prompts) > 1:
+            logger.debug(f"Sending {len(prompts)} {self.pydantic_model.__name__} prompts as one batch")
+        try:
+            results = await agent_abatch_call(prompts, self.llm_config, self.pydantic_model, agent_names, tickers)
+        except Exception as e:
+            logger.error(f"Batch of {len(prompts)} prompts failed: {e}")
+            results = [self.pydantic_model() for _ in prompts]
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Batch queues per event loop, keyed by LLM config and schema
+_batch_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, _BatchQueue]]" = weakref.WeakKeyDictionary()
+
+def _get_batch_queue(llm_config: Dict[str, Any], pydantic_model: BaseModel) -> _BatchQueue:
+    """Get the batch queue of a config and schema on the running loop."""
+    loop_queues = _batch_queues.setdefault(asyncio.get_running_loop(), {})
+    key = (json.dumps(llm_config, sort_keys=True, default=str), pydantic_model)
+    if key not in loop_queues:
+        loop_queues[key] = _BatchQueue(llm_config, pydantic_model)
+    return loop_queues[key]
@@ -128,4 +128,43 @@ You must provide your control recommendation as a structured output with the fol
 - justification: A brief explanation of your recommendation
 
 Your response should be well-reasoned and consider all aspects of the analysis.
-"""
\ No newline at end of file
+"""
+
+RISK_DECISION_PROMPT = """
+You are a portfolio manager controlling the position risk of the ticker and making the final trading decision based on analyst signals, portfolio state and decision memory.
+
+Here are the analyst signals:
+{ticker_signals}
+
+Here is the portfolio state:
+{portfolio}
+
+Here is the decision memory:
+{decision_memory}
+
+Current Price: {current_price}
+Holding Shares: {current_shares}
+
+The position ratio range:  [0, {max_position_ratio}], the minimum step is 0.05.
+If you obeserve more bullish signals, you can set a larger position ratio.
+If you obeserve more bearish signals, you can set a smaller position ratio.
+
+Buy or sell shares to move the position value towards the optimal position ratio of the total portfolio value, or hold if it is already close.
+
+You must provide your control recommendation and decision as a structured output with the following fields:
+- optimal_position_ratio: The optimal ratio of the position value to the total portfolio value
+- action: One of ["Buy", "Sell", "Hold"]
+- shares: Number of shares to buy or sell, set 0 for hold
+- justification: A brief explanation of your recommendation and decision
+
+Your response should be well-reasoned and consider all aspects of the analysis.
+"""
+
+REPAIR_PROMPT = """
+{prompt}
+
+Your previous response could not be used because it did not match the required structured output:
+{error}
+
+Respond again with the required structured output, filling every field with a valid value.
+"""
@@ -8,6 +8,7 @@ from langchain_deepseek import ChatDeepSeek
 from langchain_ollama import ChatOllama
 from langchain_fireworks import ChatFireworks
 from langchain_core.language_models.chat_models import BaseChatModel
+from llm.fake import FakeChatModel
 
 @dataclass
 class ModelConfig:
@@ -16,6 +17,7 @@ class ModelConfig:
     env_key: Optional[str] = None
     base_url: Optional[str] = None
     requires_api_key: bool = True
+    max_concurrency: int = 8 # in-flight async requests per process
 
 class Provider(str, Enum):
     """Supported LLM providers"""
@@ -28,6 +30,7 @@ class Provider(str, Enum):
     FIREWORKS= "Fireworks"
     YIZHAN = "YiZhan"
     AIHUBMIX = "AiHubMix"
+    FAKE = "Fake" # offline, deterministic outputs for load and regression runs
 
     @property
     def config(self) -> ModelConfig:
@@ -58,6 +61,7 @@ class Provider(str, Enum):
             Provider.OLLAMA: ModelConfig(
                 model_class=ChatOllama,
                 requires_api_key=False,
+                max_concurrency=2, # local server
             ),
             Provider.FIREWORKS: ModelConfig(
                 model_class=ChatFireworks,
@@ -73,5 +77,9 @@ class Provider(str, Enum):
                 env_key="AIHUBMIX_API_KEY",
                 base_url="https://api.aihubmix.com/v1",
             ),
+            Provider.FAKE: ModelConfig(
+                model_class=FakeChatModel,
+                requires_api_key=False,
+            ),
         }
         return PROVIDER_CONFIGS[self]
\ No newline at end of file
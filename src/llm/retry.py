@@ -0,0 +1,118 @@
+"""Retry policy of agent calls: error classification, exponential backoff with jitter, Retry-After and deadline."""
+
+import random
+from time import monotonic
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from pydantic import ValidationError
+
+class ErrorClass:
+    TRANSIENT = "transient" # throttling, timeouts, connection and server errors, retried with backoff
+    VALIDATION = "validation" # output does not fit the schema, re-prompted once with a repair instruction
+    FATAL = "fatal" # auth, permission and bad requests, programming errors and anything unknown, never retried
+
+# HTTP status codes by class
+TRANSIENT_STATUS = {408, 409, 429}
+FATAL_STATUS = {400, 401, 402, 403, 404, 422}
+
+# Provider SDK exception names, matched by name so no SDK needs to be imported
+TRANSIENT_ERRORS = {
+    "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+    "ServiceUnavailableError", "OverloadedError", "Timeout", "TimeoutError", "ConnectError",
+    "ReadTimeout", "ConnectTimeout", "RemoteProtocolError", "ConnectionError",
+    "TimeoutException", "NetworkError", # httpx base classes
+}
+FATAL_ERRORS = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError", "NotFoundError",
+    "UnprocessableEntityError",
+}
+VALIDATION_ERRORS = {"OutputParserException"}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a provider error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def classify_error(error: Exception) -> str:
+    """Classify an agent call error. Only known throttling, timeout, connection and server errors are transient."""
+    if isinstance(error, ValidationError):
+        return ErrorClass.VALIDATION
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & VALIDATION_ERRORS or (isinstance(error, ValueError) and "LLM returned None" in str(error)):
+        return ErrorClass.VALIDATION
+
+    status = _status_code(error)
+    if status is not None:
+        if status in TRANSIENT_STATUS or status >= 500:
+            return ErrorClass.TRANSIENT
+        if status in FATAL_STATUS:
+            return ErrorClass.FATAL
+    if names & FATAL_ERRORS:
+        return ErrorClass.FATAL
+    if names & TRANSIENT_ERRORS:
+        return ErrorClass.TRANSIENT
+    return ErrorClass.FATAL
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked to wait, from the Retry-After headers of the error response."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy:
+    """Retry decisions of one agent call."""
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float, deadline: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = monotonic() + deadline
+        self.attempt = 0
+        self.repair = False # next attempts carry the repair instruction
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline."""
+        return max(0.0, self.deadline - monotonic())
+
+    def next_delay(self, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying after error, None to give up."""
+        self.attempt += 1
+        error_class = classify_error(error)
+        if error_class == ErrorClass.FATAL or self.attempt >= self.max_retries:
+            return None
+
+        if error_class == ErrorClass.VALIDATION:
+            if self.repair:
+                return None
+            self.repair = True
+            delay = 0.0
+        else:
+            # full jitter, unless the provider said how long to wait
+            delay = retry_after(error)
+            if delay is None:
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (self.attempt - 1)))
+
+        if delay >= self.remaining():
+            return None
+        return delay
@@ -0,0 +1,123 @@
+"""Token, latency and cost accounting of agent calls."""
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# USD per million (input, output) tokens, matched by the longest model name prefix.
+# Set input_price / output_price in the llm config for models missing here or with other rates.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "o3-mini": (1.10, 4.40),
+    "o4-mini": (1.10, 4.40),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "qwen-max": (1.60, 6.40),
+    "qwen-plus": (0.40, 1.20),
+    "qwen-turbo": (0.05, 0.20),
+}
+
+def model_price(model: str, input_price: Optional[float] = None, output_price: Optional[float] = None) -> Optional[Tuple[float, float]]:
+    """Per million token prices of a model, None if unknown."""
+    if input_price is not None and output_price is not None:
+        return input_price, output_price
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        return None
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+@dataclass
+class LLMUsage:
+    """Usage of one agent call, summed over its attempts."""
+    agent: str
+    ticker: Optional[str]
+    provider: str
+    model: str
+    output_schema: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0 # seconds, including retries and backoff
+    retries: int = 0
+    cost: Optional[float] = None # USD
+    cached: bool = False
+
+    def __post_init__(self):
+        self._start = perf_counter()
+
+    def add_tokens(self, output: Any):
+        """Add the token counts of an include_raw structured output."""
+        raw = output.get("raw") if isinstance(output, dict) else None
+        metadata = getattr(raw, "usage_metadata", None) or {}
+        self.prompt_tokens += metadata.get("input_tokens", 0)
+        self.completion_tokens += metadata.get("output_tokens", 0)
+
+    def finish(self, input_price: Optional[float] = None, output_price: Optional[float] = None) -> "LLMUsage":
+        """Stop the clock and price the tokens."""
+        self.latency = perf_counter() - self._start
+        prices = model_price(self.model, input_price, output_price)
+        if prices is not None:
+            self.cost = (self.prompt_tokens * prices[0] + self.completion_tokens * prices[1]) / 1_000_000
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class UsageTracker:
+    """Usage records of the current run."""
+
+    def __init__(self):
+        self._records: List[LLMUsage] = []
+        self._lock = threading.Lock()
+
+    def record(self, usage: LLMUsage):
+        with self._lock:
+            self._records.append(usage)
+
+    def drain(self) -> List[LLMUsage]:
+        """Take every record collected so far."""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    @staticmethod
+    def breakdown(records: List[LLMUsage]) -> str:
+        """Per agent table of calls, tokens, latency and cost, most expensive first."""
+        rows = defaultdict(lambda: {"calls": 0, "cached": 0, "prompt": 0, "completion": 0, "latency": 0.0, "retries": 0, "cost": 0.0})
+        for usage in records:
+            row = rows[usage.agent]
+            row["calls"] += 1
+            row["cached"] += usage.cached
+            row["prompt"] += usage.prompt_tokens
+            row["completion"] += usage.completion_tokens
+            row["latency"] += usage.latency
+            row["retries"] += usage.retries
+            row["cost"] += usage.cost or 0.0
+
+        lines = [f"{'agent':<20}{'calls':>6}{'cached':>7}{'prompt':>9}{'compl.':>8}{'latency':>9}{'retries':>8}{'cost $':>10}"]
+        for agent, row in sorted(rows.items(), key=lambda item: (item[1]["cost"], item[1]["latency"]), reverse=True):
+            lines.append(
+                f"{agent:<20}{row['calls']:>6}{row['cached']:>7}{row['prompt']:>9}{row['completion']:>8}"
+                f"{row['latency']:>8.1f}s{row['retries']:>8}{row['cost']:>10.4f}"
+            )
+        return "\n".join(lines)
+
+
+# process-wide tracker, drained at the end of each run
+_usage_tracker = UsageTracker()
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the usage tracker shared by every agent call."""
+    return _usage_tracker
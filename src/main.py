@@ -5,6 +5,7 @@ from graph.workflow import AgentWorkflow
 from util.config import ConfigParser
 from util.logger import logger
 from util.db_helper import db_initialize, get_db
+from apis.cassette import CassetteMode, cassette_initialize, cassette_eject
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,9 +20,10 @@ def load_portfolio_config(cfg: Dict[str, Any], db):
             raise RuntimeError(f"Failed to create config for {cfg['exp_name']}")
     return config_id
 
-def run_single_day_analysis(config_file_path: str, trading_date_str: str, use_local_db_flag: bool):
+def run_single_day_analysis(config_file_path: str, trading_date_str: str, use_local_db_flag: bool, cassette_path: str = None, cassette_mode: str = None):
     """
     Runs the DeepFund analysis workflow for a single trading day.
+    With cassette_path, raw data API responses are recorded into or replayed from that file according to cassette_mode.
     """
     # In ConfigParser, we need to adjust it to accept file path and trading_date_str if it currently relies on args object
     # Assuming ConfigParser can be instantiated or called with config_file_path and trading_date_str
@@ -44,6 +46,8 @@ def run_single_day_analysis(config_file_path: str, trading_date_str: str, use_lo
         return True # Indicate success as it's already done or not needed
     
     try:
+        if cassette_path:
+            cassette_initialize(cassette_path, cassette_mode)
         app = AgentWorkflow(cfg, config_id)
         time_cost = app.run(config_id) # cfg already contains trading_date, app might use it
         logger.info(f"DeepFund run for {trading_date_str} completed in {time_cost:.2f} seconds")
@@ -51,6 +55,8 @@ def run_single_day_analysis(config_file_path: str, trading_date_str: str, use_lo
     except Exception as e:
         logger.error(f"Error during portfolio operations for {trading_date_str}: {e}")
         return False # Indicate failure
+    finally:
+        cassette_eject()
 
 def main():
     """Main entry point for the DeepFund System (Command Line Interface)."""
@@ -60,10 +66,19 @@ def main():
     parser.add_argument("--config", type=str, required=True, help="Path to configuration file")
     parser.add_argument("--trading-date", type=str, required=True, help="Trading date in format YYYY-MM-DD")
     parser.add_argument("--local-db", action="store_true", help="Use local SQLite database")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=str, metavar="CASSETTE", help="Record raw data API responses into a cassette file (.json.gz)")
+    cassette_group.add_argument("--replay", type=str, metavar="CASSETTE", help="Replay raw data API responses from a cassette file instead of the network")
     args = parser.parse_args()
 
+    cassette_path, cassette_mode = None, None
+    if args.record:
+        cassette_path, cassette_mode = args.record, CassetteMode.RECORD
+    elif args.replay:
+        cassette_path, cassette_mode = args.replay, CassetteMode.REPLAY
+
     # Call the refactored analysis function
-    run_single_day_analysis(args.config, args.trading_date, args.local_db)
+    run_single_day_analysis(args.config, args.trading_date, args.local_db, cassette_path, cassette_mode)
 
 if __name__ == "__main__":
     main()
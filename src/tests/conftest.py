@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# keep every on-disk cache, store and database of the tests out of src/assets, set before the modules read them
+_tmp_dir = tempfile.mkdtemp(prefix="deepfund-tests-")
+os.environ.setdefault("CACHE_DIR", os.path.join(_tmp_dir, "cache"))
+os.environ.setdefault("PRICE_STORE_DIR", os.path.join(_tmp_dir, "prices"))
+os.environ.setdefault("DB_PATH", os.path.join(_tmp_dir, "db", "deepfund.db"))
+os.environ.setdefault("API_CACHE", "0")
@@ -0,0 +1,78 @@
+import time
+import asyncio
+import pytest
+from pydantic import BaseModel, Field
+from util.cache import SQLiteCache
+from llm.inference import agent_call, agent_acall
+from llm.usage import get_usage_tracker
+
+
+class Output(BaseModel):
+    signal: str = Field(default="neutral")
+    confidence: float = Field(default=0.0)
+
+
+FAKE_CONFIG = {"provider": "Fake", "model": "fake", "cache": True, "batch_window": 0}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+
+
+def test_get_set(cache):
+    key = cache.make_key("a", {"b": 1})
+    assert cache.get(key) is None
+    cache.set(key, {"value": [1, 2]})
+    assert cache.get(key) == {"value": [1, 2]}
+
+
+def test_key_independent_of_dict_order(cache):
+    assert cache.make_key({"a": 1, "b": 2}) == cache.make_key({"b": 2, "a": 1})
+
+
+def test_expired_entry_is_missing(cache, monkeypatch):
+    cache.set("key", 1, ttl=60)
+    now = time.time()
+    monkeypatch.setattr("util.cache.time.time", lambda: now + 61)
+    assert cache.get("key") is None
+
+
+def test_evicts_least_recently_used(cache, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("util.cache.time.time", lambda: float(next(clock)))
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_agent_call_served_from_cache():
+    get_usage_tracker().drain()
+    first = agent_call("cache sync prompt", FAKE_CONFIG, Output, agent_name="test")
+    second = agent_call("cache sync prompt", FAKE_CONFIG, Output, agent_name="test")
+    assert first == second
+    assert [usage.cached for usage in get_usage_tracker().drain()] == [False, True]
+
+
+async def _acall_twice(prompt: str):
+    first = await agent_acall(prompt, FAKE_CONFIG, Output, agent_name="test")
+    second = await agent_acall(prompt, FAKE_CONFIG, Output, agent_name="test")
+    return first, second
+
+
+def test_agent_acall_served_from_cache():
+    get_usage_tracker().drain()
+    first, second = asyncio.run(_acall_twice("cache async prompt"))
+    assert first == second
+    assert [usage.cached for usage in get_usage_tracker().drain()] == [False, True]
+
+
+def test_failed_call_not_cached():
+    config = {**FAKE_CONFIG, "max_retries": 1, "model_kwargs": {"failure_rate": 1.0}}
+    get_usage_tracker().drain()
+    assert agent_call("cache failing prompt", config, Output) == Output()
+    assert agent_call("cache failing prompt", config, Output) == Output()
+    assert [usage.cached for usage in get_usage_tracker().drain()] == [False, False]
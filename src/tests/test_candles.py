@@ -0,0 +1,46 @@
+import pytest
+import pandas as pd
+from apis.alphavantage.api import AlphaVantageAPI
+from apis.cassette import Cassette, CassetteMode, cassette_initialize, cassette_eject
+
+# Alpha Vantage answers latest first with string values
+CANDLE_SERIES = {
+    "2025-05-23": {"1. open": "195.0", "2. high": "197.7", "3. low": "193.5", "4. close": "195.3", "5. volume": "78432918"},
+    "2025-05-22": {"1. open": "201.4", "2. high": "202.8", "3. low": "200.5", "4. close": "201.4", "5. volume": "46742353"},
+    "2025-05-21": {"1. open": "205.2", "2. high": "207.0", "3. low": "200.7", "4. close": "202.1", "5. volume": "59211767"},
+}
+
+
+@pytest.fixture
+def replayed_api(tmp_path):
+    """AlphaVantageAPI replaying a recorded TIME_SERIES_DAILY response."""
+    path = str(tmp_path / "candles.json.gz")
+    recorder = Cassette(path, CassetteMode.RECORD)
+    params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}
+    recorder.fetch("alpha_vantage", params["function"], params, lambda: {"Time Series (Daily)": CANDLE_SERIES})
+    recorder.save()
+
+    cassette_initialize(path, CassetteMode.REPLAY)
+    yield AlphaVantageAPI()
+    cassette_eject()
+
+
+def test_candles_sorted_and_typed(replayed_api):
+    df = replayed_api.get_daily_candles_df("AAPL", pd.Timestamp("2025-05-23"))
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index.is_monotonic_increasing
+    assert df.index.name == "Date"
+    assert df["close"].dtype == "float64" and df["volume"].dtype == "int64"
+    assert df["close"].iloc[-1] == pytest.approx(195.3)
+
+
+def test_candles_stop_at_trading_date(replayed_api):
+    df = replayed_api.get_daily_candles_df("AAPL", pd.Timestamp("2025-05-22"))
+    assert df.index[-1] == pd.Timestamp("2025-05-22")
+    assert replayed_api.get_last_close_price("AAPL", pd.Timestamp("2025-05-22")) == pytest.approx(201.4)
+
+
+def test_empty_series():
+    df = AlphaVantageAPI._parse_candles_df({}, pd.Timestamp("2025-05-22"))
+    assert df.empty
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
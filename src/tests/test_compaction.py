@@ -0,0 +1,57 @@
+import json
+import os
+from apis.common_model import MediaNews
+from llm.compaction import compact_news, compact_records, dedupe_headlines, fit_token_budget, render_records, thresholds
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "assets", "local_data", "news", "AAPL.json")
+
+
+def news(title: str, publisher: str = "Wire", summary: str = None) -> MediaNews:
+    return MediaNews(title=title, publish_time="20250530T000000", publisher=publisher, link="https://example.com", summary=summary)
+
+
+def test_drops_empty_and_link_fields():
+    records = compact_news([news("Apple ships new iPhone")])
+    assert records == [{"title": "Apple ships new iPhone", "publish_time": "20250530T000000", "publisher": "Wire"}]
+
+
+def test_truncates_long_text():
+    record = compact_records([news("t", summary="word " * 200)])[0]
+    assert len(record["summary"]) <= thresholds["max_text_chars"] + 3
+    assert record["summary"].endswith("...")
+
+
+def test_dedupes_headlines_across_publishers():
+    records = compact_news([
+        news("Apple beats earnings estimates on iPhone sales", "Reuters"),
+        news("Microsoft raises dividend", "Bloomberg"),
+        news("Apple Beats Earnings Estimates on iPhone Sales!", "Yahoo"),
+    ])
+    assert [r["publisher"] for r in records] == ["Reuters", "Bloomberg"]
+
+
+def test_keeps_headlines_differing_in_one_word():
+    records = dedupe_headlines([{"title": "Apple raises full year guidance"}, {"title": "Apple cuts full year guidance"}])
+    assert len(records) == 2
+
+
+def test_keeps_fixture_headlines():
+    with open(FIXTURE) as f:
+        items = [MediaNews(**item) for item in json.load(f)]
+    assert len(compact_news(items)) == len(items)
+
+
+def test_token_budget_keeps_leading_items():
+    records = [{"title": f"headline {i}"} for i in range(50)]
+    kept = fit_token_budget(records, 40)
+    assert 0 < len(kept) < len(records)
+    assert kept == records[:len(kept)]
+
+
+def test_token_budget_keeps_at_least_one():
+    records = [{"title": "word " * 100}]
+    assert fit_token_budget(records, 1) == records
+
+
+def test_render_one_object_per_line():
+    assert render_records([{"a": 1}, {"b": "é"}]) == '{"a":1}\n{"b":"é"}'
@@ -0,0 +1,89 @@
+import json
+import os
+import time
+from datetime import date
+import pytest
+from apis.fundamentals_store import FundamentalsStore, expected_quarter
+from apis.alphavantage.api_model import Fundamentals
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "assets", "local_data", "fundamentals", "AAPL.json")
+
+
+def make_fundamentals(latest_quarter: str) -> Fundamentals:
+    with open(FIXTURE) as f:
+        return Fundamentals(**{**json.load(f), "LatestQuarter": latest_quarter})
+
+
+class Fetcher:
+    """fetch counting its calls."""
+
+    def __init__(self, latest_quarter: str):
+        self.latest_quarter = latest_quarter
+        self.calls = 0
+
+    def __call__(self) -> Fundamentals:
+        self.calls += 1
+        return make_fundamentals(self.latest_quarter)
+
+
+def day_timestamp(day: str) -> float:
+    return time.mktime(date.fromisoformat(day).timetuple())
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FundamentalsStore(str(tmp_path / "fundamentals.db"))
+
+
+def test_expected_quarter_respects_reporting_lag():
+    assert expected_quarter(date(2025, 5, 10)) == date(2024, 12, 31)
+    assert expected_quarter(date(2025, 5, 20)) == date(2025, 3, 31)
+
+
+def test_never_serves_snapshot_newer_than_as_of(store):
+    store.save("AAPL", make_fundamentals("2025-06-30"), fetched_at=time.time())
+    fetch = Fetcher("2025-06-30")
+    assert store.get_fundamentals("AAPL", date(2025, 5, 20), fetch) is None
+
+
+def test_serves_latest_public_snapshot(store):
+    now = time.time()
+    store.save("AAPL", make_fundamentals("2024-12-31"), fetched_at=now)
+    store.save("AAPL", make_fundamentals("2025-03-31"), fetched_at=now)
+    store.save("AAPL", make_fundamentals("2025-06-30"), fetched_at=now)
+    fetch = Fetcher("2025-06-30")
+
+    # 2025-03-31 is still inside its reporting lag on 2025-05-10
+    assert store.get_fundamentals("AAPL", date(2025, 5, 10), fetch).latest_quarter == "2024-12-31"
+    assert store.get_fundamentals("AAPL", date(2025, 5, 20), fetch).latest_quarter == "2025-03-31"
+    assert fetch.calls == 0
+
+
+def test_early_report_served_once_fetched(store):
+    # reported 20 days after the quarter end, public from the fetch on
+    store.save("AAPL", make_fundamentals("2025-03-31"), fetched_at=day_timestamp("2025-04-20"))
+    fetch = Fetcher("2025-03-31")
+    assert store.get_fundamentals("AAPL", date(2025, 4, 25), fetch).latest_quarter == "2025-03-31"
+
+
+def test_fetch_when_empty(store):
+    fetch = Fetcher("2025-03-31")
+    assert store.get_fundamentals("AAPL", None, fetch).latest_quarter == "2025-03-31"
+    assert fetch.calls == 1
+    store.get_fundamentals("AAPL", None, fetch)
+    assert fetch.calls == 1
+
+
+def test_off_calendar_quarter_not_refetched_every_run(store):
+    # fiscal quarter ending a month before the calendar one stays behind expected_quarter until the next report
+    fetch = Fetcher("2025-02-28")
+    as_of = date.today()
+    store.get_fundamentals("AAPL", as_of, fetch)
+    store.get_fundamentals("AAPL", as_of, fetch)
+    assert fetch.calls == 1
+
+
+def test_refetch_keeps_first_fetch_of_quarter(store):
+    store.save("AAPL", make_fundamentals("2025-03-31"), fetched_at=day_timestamp("2025-04-20"))
+    store.save("AAPL", make_fundamentals("2025-03-31"), fetched_at=day_timestamp("2025-06-01"))
+    assert store._serve(store._snapshots("AAPL"), date(2025, 4, 25)).latest_quarter == "2025-03-31"
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from apis.insider_store import InsiderTradeIndex, InsiderTradeStore
+
+# latest first, like the API
+TRADES = [
+    {"transaction_date": "2025-05-20", "executive": "A"},
+    {"transaction_date": "2025-05-12", "executive": "B"},
+    {"transaction_date": "2025-05-12", "executive": "C"},
+    {"transaction_date": "2025-04-30", "executive": "D"},
+]
+
+
+def test_trades_strictly_before_trading_date():
+    index = InsiderTradeIndex(TRADES, fetched_on=datetime(2025, 5, 21).date())
+    trades = index.latest_before(datetime(2025, 5, 20), limit=None)
+    assert [t["executive"] for t in trades] == ["B", "C", "D"]
+    assert all(t["transaction_date"] < "2025-05-20" for t in trades)
+
+
+def test_limit_keeps_latest():
+    index = InsiderTradeIndex(TRADES, fetched_on=datetime(2025, 5, 21).date())
+    assert [t["executive"] for t in index.latest_before(datetime(2025, 6, 1), limit=2)] == ["A", "B"]
+
+
+def test_history_downloaded_once_for_earlier_dates():
+    store = InsiderTradeStore()
+    calls = []
+    fetch = lambda: calls.append(1) or TRADES
+
+    store.get_trades("AAPL", datetime(2025, 5, 21), 10, fetch)
+    store.get_trades("AAPL", datetime(2025, 5, 1), 10, fetch)
+    assert len(calls) == 1
+
+
+def test_history_refetched_for_later_dates():
+    store = InsiderTradeStore()
+    calls = []
+    fetch = lambda: calls.append(1) or TRADES
+
+    store.get_trades("AAPL", datetime(2025, 5, 21), 10, fetch)
+    store.get_trades("AAPL", datetime.now() + timedelta(days=2), 10, fetch)
+    assert len(calls) == 2
@@ -0,0 +1,33 @@
+import pytest
+from agents.portfolio_manager import bound_decision, calculate_ticker_shares, clamp_position_ratio
+from graph.constants import Action
+from graph.schema import Decision, Portfolio, Position
+
+
+@pytest.mark.parametrize("ratio, expected", [(0.5, 0.3), (-0.2, 0), (0.1, 0.1)])
+def test_clamp_position_ratio(ratio, expected):
+    assert clamp_position_ratio(ratio, 0.3) == expected
+
+
+def test_buy_bounded_by_tradable_shares():
+    decision = bound_decision(Decision(action=Action.BUY, shares=100), 40)
+    assert (decision.action, decision.shares) == (Action.BUY, 40)
+
+
+def test_sell_bounded_by_tradable_shares():
+    decision = bound_decision(Decision(action=Action.SELL, shares=100), -25)
+    assert (decision.action, decision.shares) == (Action.SELL, 25)
+
+
+@pytest.mark.parametrize("action, tradable_shares", [(Action.BUY, -10), (Action.SELL, 10), (Action.BUY, 0), (Action.HOLD, 10)])
+def test_hold_when_nothing_can_be_traded(action, tradable_shares):
+    decision = bound_decision(Decision(action=action, shares=10), tradable_shares)
+    assert (decision.action, decision.shares) == (Action.HOLD, 0)
+
+
+def test_tradable_shares_limited_by_cash_and_position():
+    portfolio = Portfolio(id="test", cashflow=1000.0, positions={"AAPL": Position(value=1000.0, shares=10)})
+    # room for 1000 more at ratio 1.0, but only 1000 cash
+    assert calculate_ticker_shares(portfolio, 100.0, "AAPL", 1.0) == (10, 10)
+    # ratio 0 sells the whole position
+    assert calculate_ticker_shares(portfolio, 100.0, "AAPL", 0.0) == (10, -10)
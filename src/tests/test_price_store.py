@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from apis.price_store import PriceStore
+
+
+def make_candles(end: str, days: int = 30) -> pd.DataFrame:
+    index = pd.bdate_range(end=end, periods=days, name="Date")
+    return pd.DataFrame({
+        "open": 1.0, "high": 1.0, "low": 1.0,
+        "close": np.arange(days, dtype="float64"),
+        "volume": 1,
+    }, index=index)
+
+
+class Fetcher:
+    """fetch_latest counting its calls."""
+
+    def __init__(self, end: str):
+        self.end = end
+        self.calls = 0
+
+    def __call__(self) -> pd.DataFrame:
+        self.calls += 1
+        return make_candles(self.end)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path))
+
+
+def test_never_serves_bars_after_as_of(store):
+    fetch = Fetcher("2025-05-23")
+    df = store.get_daily_candles_df("AAPL", "2025-05-14", fetch)
+    assert df.index[-1] <= pd.Timestamp("2025-05-14")
+    assert fetch.calls == 1
+
+
+def test_weekend_needs_no_fetch(store):
+    fetch = Fetcher("2025-05-23") # Friday
+    for day in ["2025-05-23", "2025-05-24", "2025-05-25"]:
+        df = store.get_daily_candles_df("AAPL", day, fetch)
+        assert df.index[-1] == pd.Timestamp("2025-05-23")
+    assert fetch.calls == 1
+
+
+def test_earlier_dates_served_from_store(store):
+    fetch = Fetcher("2025-05-23")
+    store.get_daily_candles_df("AAPL", "2025-05-23", fetch)
+    store.get_daily_candles_df("AAPL", "2025-05-01", fetch)
+    assert fetch.calls == 1
+
+
+def test_append_overlapping_bars(store):
+    store.append("AAPL", make_candles("2025-05-16"))
+    merged = store.append("AAPL", make_candles("2025-05-23"))
+    assert merged.index.is_unique and merged.index.is_monotonic_increasing
+    assert merged.index[-1] == pd.Timestamp("2025-05-23")
+    assert len(merged) == 35
+
+
+def test_gap_replaces_stored_series(store):
+    store.append("AAPL", make_candles("2025-01-31"))
+    merged = store.append("AAPL", make_candles("2025-05-23"))
+    assert merged.index[0] == make_candles("2025-05-23").index[0]
+    assert len(store.read("AAPL")) == 30
@@ -0,0 +1,106 @@
+import time
+from email.utils import formatdate
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+from llm import inference
+from llm.fake import RateLimitError
+from llm.inference import agent_call
+from llm.retry import ErrorClass, RetryPolicy, classify_error, retry_after
+from llm.usage import get_usage_tracker
+
+
+class Output(BaseModel):
+    signal: str = Field(default="neutral")
+
+
+class Response:
+    def __init__(self, status_code: int = None, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int = None, headers: dict = None):
+        super().__init__(f"status {status_code}")
+        self.response = Response(status_code, headers)
+
+
+def validation_error() -> ValidationError:
+    try:
+        Output(signal=1)
+    except ValidationError as e:
+        return e
+
+
+def make_policy(max_retries: int = 3) -> RetryPolicy:
+    return RetryPolicy(max_retries, base_delay=0.0, max_delay=0.0, deadline=60.0)
+
+
+@pytest.mark.parametrize("error", [KeyError("x"), TypeError("x"), RuntimeError("x"), APIError(401), APIError(400)])
+def test_fatal_errors(error):
+    assert classify_error(error) == ErrorClass.FATAL
+
+
+@pytest.mark.parametrize("error", [APIError(429), APIError(500), APIError(503), TimeoutError(), RateLimitError("x")])
+def test_transient_errors(error):
+    assert classify_error(error) == ErrorClass.TRANSIENT
+
+
+def test_validation_errors():
+    assert classify_error(validation_error()) == ErrorClass.VALIDATION
+    assert classify_error(ValueError("LLM returned None")) == ErrorClass.VALIDATION
+
+
+def test_fatal_error_never_retried():
+    policy = make_policy()
+    assert policy.next_delay(KeyError("x")) is None
+    assert policy.attempt == 1
+
+
+def test_transient_error_retried_up_to_max_retries():
+    policy = make_policy(max_retries=3)
+    assert policy.next_delay(APIError(503)) is not None
+    assert policy.next_delay(APIError(503)) is not None
+    assert policy.next_delay(APIError(503)) is None
+
+
+def test_validation_repaired_once():
+    policy = make_policy(max_retries=5)
+    assert policy.next_delay(validation_error()) == 0.0
+    assert policy.repair
+    assert policy.next_delay(validation_error()) is None
+
+
+def test_gives_up_when_delay_passes_deadline():
+    policy = RetryPolicy(3, base_delay=0.0, max_delay=0.0, deadline=1.0)
+    assert policy.next_delay(APIError(429, {"retry-after": "5"})) is None
+
+
+def test_retry_after_headers():
+    assert retry_after(APIError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+    in_ten_seconds = formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= retry_after(APIError(429, {"retry-after": in_ten_seconds})) <= 10
+    assert retry_after(APIError(429)) is None
+
+
+def test_agent_call_retries_transient_then_defaults():
+    config = {"provider": "Fake", "model": "fake", "max_retries": 3, "retry_base_delay": 0.0,
+              "model_kwargs": {"failure_rate": 1.0}}
+    get_usage_tracker().drain()
+    assert agent_call("retry transient prompt", config, Output) == Output()
+    assert [usage.retries for usage in get_usage_tracker().drain()] == [2]
+
+
+def test_agent_call_does_not_retry_fatal(monkeypatch):
+    calls = []
+
+    class BrokenModel:
+        def invoke(self, request):
+            calls.append(request)
+            raise KeyError("missing tool call")
+
+    monkeypatch.setattr(inference, "get_structured_model", lambda config, pydantic_model: BrokenModel())
+    config = {"provider": "Fake", "model": "fake", "max_retries": 3, "retry_base_delay": 0.0}
+    assert agent_call("retry fatal prompt", config, Output) == Output()
+    assert len(calls) == 1
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from util.logger import logger
+
+# Directory holding every on-disk cache, override with CACHE_DIR in .env
+CACHE_DIR = os.getenv("CACHE_DIR") or os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "cache"))
+
+
+class SQLiteCache:
+    """
+    Persistent JSON key-value cache backed by SQLite.
+    Entries carry their own TTL and the table is bounded by least-recently-used eviction.
+    Safe to share across threads and processes.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = self._get_connection()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key VARCHAR(64) PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _get_connection(self):
+        """Get a connection that waits on concurrent writers instead of failing."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash arbitrary JSON-serializable parts into a stable cache key."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, None if missing or expired."""
+        conn = None
+        try:
+            conn = self._get_connection()
+            row = conn.execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            now = time.time()
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                conn.commit()
+                return None
+
+            conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+            return json.loads(value)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.path}: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for ttl seconds (forever if ttl is None), evicting the least recently used entries."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = None
+        try:
+            conn = self._get_connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), expires_at, now)
+            )
+            conn.execute('DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?', (now,))
+            overflow = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)',
+                    (overflow,)
+                )
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.path}: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        conn = self._get_connection()
+        try:
+            conn.execute('DELETE FROM cache')
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# process-wide cache instances, one file per name
+_caches: Dict[str, SQLiteCache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name: str, max_entries: int = 5000) -> SQLiteCache:
+    """Get the shared cache stored at CACHE_DIR/<name>.db."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SQLiteCache(os.path.join(CACHE_DIR, f"{name}.db"), max_entries=max_entries)
+        return _caches[name]
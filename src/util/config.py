@@ -38,6 +38,12 @@ class ConfigParser:
             logger.info(f"exp_name not found in config, derived as: {cfg['exp_name']}")
 
         cfg['planner_mode'] = cfg.get('planner_mode', False)
+        # true: portfolio manager asks for the position ratio and decision in one call
+        cfg['fused_portfolio'] = cfg.get('fused_portfolio', False)
+
+        # data source, refer to apis/router.py: APISource
+        cfg['data'] = cfg.get('data') or {}
+        cfg['data'].setdefault('source', 'alpha_vantage')
 
         return cfg
 